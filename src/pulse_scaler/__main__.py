@@ -7,9 +7,11 @@ Generates images of scaled circuit represented as qiskit.pulse.Schedule
 """
 import qiskit as qs
 import matplotlib.pyplot as plt
-from pulse_scaler.qubit_scaling import qubit_scaler
+from pulse_scaler.qubit_scaling import qubit_scaler, qubit_scaler_many
 import pulse_scaler.backends.load_ibmq as cons
 import pulse_scaler.extrapolation as ex
+from pulse_scaler.executor import run_all
+from pulse_scaler.marginals import expval_matrix, pauli_masks
 
 
 def scale_simple_circuit() -> None:
@@ -32,23 +34,9 @@ def scale_simple_circuit() -> None:
     qc_sched = qs.schedule(trans_qc, cons.IBMQBACKEND)
     scaled_qc = qubit_scaler(qc_sched, 2)
     qc_sched += cons.MEAS_SCHED << qc_sched.duration
-    job = cons.IBMQBACKEND.run(
-        qc_sched,
-        meas_return='avg',
-        seed_simulator=cons.SEED,
-        shots=cons.SHOTS
-    )
-    qs.tools.job_monitor(job)
-    sim_result = job.result()
-    # Scale the schedule.
-    job = cons.IBMQBACKEND.run(
-        scaled_qc,
-        meas_return='avg',
-        seed_simulator=cons.SEED,
-        shots=cons.SHOTS
-    )
-    qs.tools.job_monitor(job)
-    scaled_sim_result = job.result()
+    # Run both schedules concurrently.
+    sim_result, scaled_sim_result = run_all([[qc_sched, scaled_qc]],
+                                            cons.IBMQBACKEND)[0]
     print(sim_result.get_counts(), scaled_sim_result.get_counts())
     # Generate the images.
     qc_sched.draw()
@@ -71,35 +59,24 @@ def mitigate_simple_circuit() -> None:
                                      cons.IBMQBACKEND,
                                      optimization_level=3)
     qc_sched = qs.schedule(trans_qc, cons.IBMQBACKEND)
-    scaled_qc1 = qubit_scaler(qc_sched, 2)
-    scaled_qc2 = qubit_scaler(qc_sched, 3)
-    scaled_qc3 = qubit_scaler(qc_sched, 4)
-    scaled_qc4 = qubit_scaler(qc_sched, 5)
+    scale = [1, 2, 3, 4, 5]
+    scaled_qcs = qubit_scaler_many(qc_sched, scale[1:])
     qc_sched += cons.MEAS_SCHED << qc_sched.duration
-    to_run = [
-        qc_sched,
-        scaled_qc1,
-        scaled_qc2,
-        scaled_qc3,
-        scaled_qc4
-    ]
-    expvals = []
-    for circ in to_run:
-        job = cons.IBMQBACKEND.run(
-            circ,
-            meas_return='avg',
-            seed_simulator=cons.SEED,
-            seed_transpiler=cons.SEED,
-            shots=cons.SHOTS
-        )
-        qs.tools.job_monitor(job)
-        sim_result = job.result()
-        try:
-            print(sim_result.get_counts())
-            expvals.append(sim_result.get_counts()["0000001"] / cons.SHOTS)
-        except KeyError:
-            expvals.append(sim_result.get_counts()["01 00"] / cons.SHOTS)
-    print(ex.rich_extr(expvals, [1, 2, 3]))
+    to_run = [qc_sched] + scaled_qcs
+    # Split the shots of the five runs to minimize the variance of the
+    # Richardson estimate. The runs all get different shots, packing them
+    # would still submit one job per run.
+    shots = ex.allocate_shots([float(fac) for fac in scale],
+                              len(scale) * cons.SHOTS, "richardson")
+    results = run_all([to_run], cons.IBMQBACKEND,
+                      shot_table=[shots.tolist()],
+                      seed_transpiler=cons.SEED)[0]
+    # Z on each qubit and ZZ, observables x scale factors.
+    paulis = ["IZ", "ZI", "ZZ"]
+    expvals = expval_matrix(results, pauli_masks(paulis))
+    for pauli, estimate in zip(paulis,
+                               ex.zne_extr(expvals, scale, "richardson")):
+        print(pauli, estimate)
 
 
 def looking_at_schedules() -> None:
@@ -2,6 +2,6 @@
 # Backends.
 
 Regrouping all the information regarding noisy backends.
+The IBMQ account is only loaded when an IBMQ backend object is first used,
+see pulse_scaler.backends.load_ibmq.
 """
-import qiskit as qs
-qs.IBMQ.load_account()
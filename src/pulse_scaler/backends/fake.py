@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Fake backends.
+
+Offline backends built on qiskit.test.mock, imported by
+pulse_scaler.backends.load_ibmq only when one of them is first used.
+- NoiseLessBackend: 1 qubit backend with as low a noise as possible.
+- NoiseBackend: 1 qubit backend with noise.
+- SnapshotBackend: backend read from a snapshot written by save_snapshot.
+"""
+import json
+import os
+from qiskit.test.mock import fake_pulse_backend
+import numpy as np
+from pulse_scaler.backends.load_ibmq import CONF_FILENAME, \
+    DEFS_FILENAME, PROPS_FILENAME, SEED
+
+# The classes only set the files FakePulseBackend reads.
+# pylint: disable=too-few-public-methods
+
+
+class NoiseLessBackend(fake_pulse_backend.FakePulseBackend):  # type: ignore
+    """A fake 1 qubit backend with a low noise as possible."""
+
+    np.random.seed(SEED)
+
+    dirname = os.path.dirname(__file__)
+    conf_filename = "noise_less/conf.json"
+    props_filename = "noise_less/props.json"
+    defs_filename = "noise_less/defs.json"
+    backend_name = "noiseless_sim"
+
+    def __init__(self) -> None:
+        """Noiseless Backend."""
+        super().__init__()
+        self.std = 0.0
+
+
+class NoiseBackend(fake_pulse_backend.FakePulseBackend):  # type: ignore
+    """A fake 1 qubit backend with a low noise as possible."""
+
+    np.random.seed(SEED)
+
+    dirname = os.path.dirname(__file__)
+    conf_filename = "base_noise/conf.json"
+    props_filename = "base_noise/props.json"
+    defs_filename = "base_noise/defs.json"
+    backend_name = "noise_sim"
+
+    def __init__(self, scale_factor: int) -> None:
+        """Initialize as Noisy fake backend."""
+        _ = scale_factor
+        super().__init__()
+
+
+class SnapshotBackend(fake_pulse_backend.FakePulseBackend):  # type: ignore
+    """A fake backend read from a snapshot written by save_snapshot."""
+
+    conf_filename = CONF_FILENAME
+    props_filename = PROPS_FILENAME
+    defs_filename = DEFS_FILENAME
+
+    def __init__(self, dirname: str) -> None:
+        """Initialize from the snapshot directory dirname."""
+        self.dirname = dirname
+        with open(os.path.join(dirname, self.conf_filename),
+                  "r", encoding="utf-8") as file:
+            self.backend_name = json.load(file)["backend_name"]
+        super().__init__()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Latency backend.
+
+Local stand-in for a remote backend: wraps any backend and makes its jobs
+finish latency seconds after submission, optionally failing the first
+submissions, so that job submission and collection can be exercised
+offline.
+"""
+import time
+from typing import Any
+
+
+class LatencyJob:
+    """Job of a LatencyBackend."""
+
+    def __init__(self,
+                 backend: "LatencyBackend",
+                 job: Any,
+                 ready_at: float,
+                 fail: bool) -> None:
+        """Wrap job, in its final state at time ready_at."""
+        self.backend = backend
+        self.job = job
+        self.ready_at = ready_at
+        self.fail = fail
+        self._collected = False
+
+    def in_final_state(self) -> bool:
+        """Whether the latency elapsed."""
+        return time.monotonic() >= self.ready_at
+
+    def result(self) -> Any:
+        """Wait for the latency, then return the result of the inner job."""
+        time.sleep(max(self.ready_at - time.monotonic(), 0.))
+        if not self._collected:
+            self._collected = True
+            self.backend.in_flight -= 1
+        if self.fail:
+            raise RuntimeError("Job failed on the latency backend.")
+        return self.job.result()
+
+
+class LatencyBackend:
+    """
+    # Backend with latency.
+
+    params:
+        backend: backend running the experiments.
+        latency: seconds between the submission and the end of a job.
+        failures: number of first submissions whose result raises.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self,
+                 backend: Any,
+                 latency: float = 0.1,
+                 failures: int = 0) -> None:
+        """Wrap backend."""
+        self.backend = backend
+        self.latency = latency
+        self.failures = failures
+        self.submitted = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def run(self, experiments: Any, **options: Any) -> LatencyJob:
+        """Submit experiments to the inner backend."""
+        self.submitted += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        fail = self.failures > 0
+        if fail:
+            self.failures -= 1
+        return LatencyJob(self, self.backend.run(experiments, **options),
+                          time.monotonic() + self.latency, fail)
@@ -11,62 +11,176 @@ Defines many usefull constants.
 - CONFIG: IbmqBackend configuration at the current time.
 - MEAS_SCHED: Measure schedule defined in configuration.
 - CALIBRATION: Calibration defined by the IBMq system.
+- NoiseLessBackend, NoiseBackend, SnapshotBackend: fake backends of
+  pulse_scaler.backends.fake.
+
+The backend objects are created on first access, so importing this module
+does no network call. They come from, in order:
+- the backend given to use_backend(),
+- the PULSE_SCALER_BACKEND environment variable, 'noise_less',
+  'base_noise' or the directory of a snapshot written by save_snapshot(),
+- the snapshot directory in PULSE_SCALER_SNAPSHOT if it exists,
+- ibmq_jakarta, saved to PULSE_SCALER_SNAPSHOT if it is set.
 """
+import datetime
+import importlib
+import json
 import os
-import qiskit as qs
-from qiskit.providers.aer import PulseSimulator
-from qiskit.providers.aer.pulse import PulseSystemModel
-from qiskit.test.mock import fake_pulse_backend
+from typing import Any, Callable, Optional
 import numpy as np
 SEED = 67934
+SHOTS = 10_000
+BASIS = ['id', 'rx', 'sx', 'x', 'cx']
+FREQ_EST = 4.97e9
+DRIVE_EST = 6.35e7
+BACKEND_ENV = "PULSE_SCALER_BACKEND"
+SNAPSHOT_ENV = "PULSE_SCALER_SNAPSHOT"
+# Files of a snapshot directory.
+CONF_FILENAME = "conf.json"
+PROPS_FILENAME = "props.json"
+DEFS_FILENAME = "defs.json"
+# Classes of pulse_scaler.backends.fake, imported on first access so that
+# qiskit.test.mock is only imported when a fake backend is used.
+FAKE_BACKENDS = ("NoiseLessBackend", "NoiseBackend", "SnapshotBackend")
 
+_SELECTED: Optional[Any] = None
 
-class NoiseLessBackend(fake_pulse_backend.FakePulseBackend):  # type: ignore
-    """A fake 1 qubit backend with a low noise as possible."""
 
-    np.random.seed(SEED)
+def json_default(obj: Any) -> Any:
+    """Encode what json can't, the way the fake backends files do."""
+    if isinstance(obj, complex):
+        return [obj.real, obj.imag]
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Can't encode {type(obj)} in json.")
 
-    dirname = os.path.dirname(__file__)
-    conf_filename = "noise_less/conf.json"
-    props_filename = "noise_less/props.json"
-    defs_filename = "noise_less/defs.json"
-    backend_name = "noiseless_sim"
 
-    def __init__(self) -> None:
-        """Noiseless Backend."""
-        super().__init__()
-        self.std = 0.0
+def save_snapshot(path: str, backend: Optional[Any] = None) -> None:
+    """
+    # Save a backend to a snapshot directory.
 
+    Writes the configuration, properties and defaults of backend (the
+    current IBMQBACKEND if None) where SnapshotBackend can read them.
+    """
+    backend = _lazy("IBMQBACKEND") if backend is None else backend
+    os.makedirs(path, exist_ok=True)
+    properties = backend.properties()
+    content = {
+        CONF_FILENAME: backend.configuration().to_dict(),
+        PROPS_FILENAME: (None if properties is None
+                         else properties.to_dict()),
+        DEFS_FILENAME: backend.defaults().to_dict(),
+    }
+    for filename, value in content.items():
+        with open(os.path.join(path, filename), "w", encoding="utf-8") as file:
+            json.dump(value, file, default=json_default)
 
-class NoiseBackend(fake_pulse_backend.FakePulseBackend):  # type: ignore
-    """A fake 1 qubit backend with a low noise as possible."""
 
-    np.random.seed(SEED)
+def use_backend(backend: Optional[Any]) -> None:
+    """
+    # Replace the backend every constant is built from.
 
-    dirname = os.path.dirname(__file__)
-    conf_filename = "base_noise/conf.json"
-    props_filename = "base_noise/props.json"
-    defs_filename = "base_noise/defs.json"
-    backend_name = "noise_sim"
+    For example use_backend(NoiseLessBackend()) to work offline.
+    None goes back to the default resolution order.
+    """
+    # pylint: disable=global-statement
+    global _SELECTED
+    _SELECTED = backend
+    for name in _FACTORIES:
+        globals().pop(name, None)
 
-    def __init__(self, scale_factor: int) -> None:
-        """Initialize as Noisy fake backend."""
-        _ = scale_factor
-        super().__init__()
 
+def selected_backend() -> Optional[Any]:
+    """Backend given to use_backend, None if none is."""
+    return _SELECTED
 
-SHOTS = 10_000
-BASIS = ['id', 'rx', 'sx', 'x', 'cx']
-provider = qs.IBMQ.get_provider(hub="ibm-q-sherbrooke",
+
+def _fake_backends() -> Any:
+    """Import pulse_scaler.backends.fake, on first use only."""
+    return importlib.import_module("pulse_scaler.backends.fake")
+
+
+def _from_name(name: str) -> Any:
+    """Fake backend of a PULSE_SCALER_BACKEND value."""
+    fake = _fake_backends()
+    if name == "noise_less":
+        return fake.NoiseLessBackend()
+    if name == "base_noise":
+        return fake.NoiseBackend(1)
+    if os.path.isdir(name):
+        return fake.SnapshotBackend(name)
+    raise ValueError(f"Unknown backend '{name}' in {BACKEND_ENV}.")
+
+
+def _ibmq_provider() -> Any:
+    """IBMQ provider, loads the account."""
+    # pylint: disable=import-outside-toplevel
+    import qiskit as qs
+    qs.IBMQ.load_account()
+    return qs.IBMQ.get_provider(hub="ibm-q-sherbrooke",
                                 group="udes", project="eibmq-iq")
-IBMQBACKEND = provider.get_backend("ibmq_jakarta")
-backend = IBMQBACKEND
-FREQ_EST = 4.97e9
-DRIVE_EST = 6.35e7
-backen_config = backend.configuration()
-defaults = backend.defaults()
-armonk_model = PulseSystemModel.from_backend(backend)
-CALIBRATION = defaults.instruction_schedule_map
-CONFIG = backen_config
-MEAS_SCHED = CALIBRATION.get('measure', range(CONFIG.n_qubits))
-BACKEND = PulseSimulator.from_backend(backend)
+
+
+def _ibmq_backend() -> Any:
+    """Backend every other constant is built from."""
+    if _SELECTED is not None:
+        return _SELECTED
+    if os.environ.get(BACKEND_ENV):
+        return _from_name(os.environ[BACKEND_ENV])
+    snapshot = os.environ.get(SNAPSHOT_ENV)
+    if snapshot and os.path.isdir(snapshot):
+        return _fake_backends().SnapshotBackend(snapshot)
+    ibmq_backend = _lazy("provider").get_backend("ibmq_jakarta")
+    if snapshot:
+        save_snapshot(snapshot, ibmq_backend)
+    return ibmq_backend
+
+
+def _pulse_model() -> Any:
+    """Pulse system model of the backend."""
+    # pylint: disable=import-outside-toplevel
+    from qiskit.providers.aer.pulse import PulseSystemModel
+    return PulseSystemModel.from_backend(_lazy("backend"))
+
+
+def _pulse_simulator() -> Any:
+    """Pulse simulator of the backend."""
+    # pylint: disable=import-outside-toplevel
+    from qiskit.providers.aer import PulseSimulator
+    return PulseSimulator.from_backend(_lazy("backend"))
+
+
+_FACTORIES: dict[str, Callable[[], Any]] = {
+    "provider": _ibmq_provider,
+    "IBMQBACKEND": _ibmq_backend,
+    "backend": lambda: _lazy("IBMQBACKEND"),
+    "backen_config": lambda: _lazy("backend").configuration(),
+    "defaults": lambda: _lazy("backend").defaults(),
+    "armonk_model": _pulse_model,
+    "CALIBRATION": lambda: _lazy("defaults").instruction_schedule_map,
+    "CONFIG": lambda: _lazy("backen_config"),
+    "MEAS_SCHED": lambda: _lazy("CALIBRATION").get(
+        'measure', range(_lazy("CONFIG").n_qubits)
+    ),
+    "BACKEND": _pulse_simulator,
+}
+
+
+def _lazy(name: str) -> Any:
+    """Backend object name, created if it wasn't yet."""
+    if name not in globals():
+        globals()[name] = _FACTORIES[name]()
+    return globals()[name]
+
+
+def __getattr__(name: str) -> Any:
+    """Create the backend objects on first access."""
+    if name in FAKE_BACKENDS:
+        return getattr(_fake_backends(), name)
+    if name not in _FACTORIES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _lazy(name)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module benchmark.
+
+Benchmarks of the hot paths of pulse_scaler, runnable offline:
+- PulseIntegrator and pulse_areas areas per second,
+- find_pulse_amp latency per pulse shape,
+- qubit_scaler throughput against schedule depth and qubit count, on the
+  bundled fake backends,
+- extrapolators throughput against the number of observables.
+
+Usage:
+    python -m pulse_scaler.benchmark -o new.json
+    python -m pulse_scaler.benchmark -o new.json --compare old.json
+The comparison exits with status 1 if a benchmark is slower than in the
+old run by more than the threshold.
+"""
+import argparse
+import functools
+import json
+import platform
+import sys
+import time
+from typing import Any, Callable, Optional
+import numpy as np
+import pulse_scaler.extrapolation as ex
+from pulse_scaler.pulse_areas import FloatArray, pulse_areas
+from pulse_scaler.pulse_integrator import PulseIntegrator, find_pulse_amp
+
+# Parameters of the benchmarked pulses, (dur, amp, sig, kwargs).
+PULSES: dict[str, tuple[float, complex, float, dict[str, float]]] = {
+    "Gaussian": (160., 0.2 + 0.05j, 40., {}),
+    "Drag": (160., 0.2 + 0.05j, 40., {"beta": 1.5}),
+    "Gaussian_Square": (800., 0.1 + 0.02j, 64., {"width": 544.}),
+}
+
+
+def time_call(func: Callable[[], Any],
+              repeat: int = 5,
+              min_time: float = 0.05) -> float:
+    """Best time in seconds of one call to func, over repeat runs."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def bench_integrator(n_pulses: int = 1000) -> dict[str, float]:
+    """Areas per second of the quadrature and of the closed forms."""
+    out = {}
+    for shape, (dur, amp, sig, kwargs) in PULSES.items():
+        def quadrature(dur: float = dur, amp: complex = amp,
+                       sig: float = sig,
+                       kwargs: dict[str, float] = kwargs) -> Any:
+            return PulseIntegrator(amp, dur, sig, **kwargs).area
+        out[f"integrator/quad/{shape}/areas_per_s"] = 1 / time_call(quadrature)
+        width = kwargs.get("width")
+        shapes = np.full(n_pulses, shape)
+        durs = np.full(n_pulses, dur)
+        out[f"integrator/analytic/{shape}/areas_per_s"] = n_pulses / time_call(
+            functools.partial(pulse_areas, shapes, amp, durs, sig,
+                              width=width)
+        )
+    return out
+
+
+def bench_solver() -> dict[str, float]:
+    """Latency in seconds of find_pulse_amp per shape and method."""
+    out = {}
+    for shape, (dur, amp, sig, kwargs) in PULSES.items():
+        for method in ("analytic", "fsolve"):
+            out[f"solver/{method}/{shape}/latency_s"] = time_call(
+                functools.partial(find_pulse_amp, shape, dur, amp, sig, 3,
+                                  method=method, **kwargs)
+            )
+    return out
+
+
+def synthetic_schedule(depth: int, n_qubits: int) -> Any:
+    """Schedule of depth layers of X pulses on n_qubits drive channels."""
+    # pylint: disable=import-outside-toplevel
+    import qiskit.pulse as ps
+    pulses = [ps.Drag(160, 0.2 + 0.01j * qubit, 40, 1.5)
+              for qubit in range(n_qubits)]
+    pairs = [(160 * layer, ps.Play(pulses[qubit], ps.DriveChannel(qubit)))
+             for layer in range(depth) for qubit in range(n_qubits)]
+    return ps.Schedule(*pairs)
+
+
+def bench_scaler(depths: tuple[int, ...] = (10, 100, 1000),
+                 qubits: tuple[int, ...] = (1, 2, 5)) -> dict[str, float]:
+    """Instructions per second of qubit_scaler on the noiseless backend."""
+    # pylint: disable=import-outside-toplevel
+    from pulse_scaler.backends import load_ibmq as cons
+    from pulse_scaler.pulse_cache import PulseCache
+    from pulse_scaler.qubit_scaling import qubit_scaler
+
+    def scale_cold(sched: Any) -> Any:
+        """Scale sched with an empty cache."""
+        return qubit_scaler(sched, 3, PulseCache())
+
+    previous = cons.selected_backend()
+    cons.use_backend(cons.NoiseLessBackend())
+    out = {}
+    try:
+        for depth in depths:
+            for n_qubits in qubits:
+                sched = synthetic_schedule(depth, n_qubits)
+                cold = time_call(functools.partial(scale_cold, sched),
+                                 repeat=3)
+                warm = time_call(functools.partial(qubit_scaler, sched, 3,
+                                                   PulseCache()), repeat=3)
+                name = f"scaler/depth={depth}/qubits={n_qubits}"
+                out[f"{name}/cold/instr_per_s"] = depth * n_qubits / cold
+                out[f"{name}/warm/instr_per_s"] = depth * n_qubits / warm
+    finally:
+        cons.use_backend(previous)
+    return out
+
+
+def bench_extrapolation(counts: tuple[int, ...] = (10, 100, 1000)
+                        ) -> dict[str, float]:
+    """Observables per second of the extrapolators."""
+    rng = np.random.default_rng(0)
+    scale = np.array([1., 2., 3., 4., 5.])
+
+    def lin_loop(points: FloatArray) -> Any:
+        """Extrapolate every row of points with lin_extr."""
+        return [ex.lin_extr(row, scale) for row in points]
+
+    def rich_loop(points: FloatArray) -> Any:
+        """Extrapolate every row of points with rich_extr."""
+        return [ex.rich_extr(list(row), list(scale)) for row in points]
+
+    def epsilon_loop(points: FloatArray) -> Any:
+        """Extrapolate every row of points with epsilon."""
+        return [ex.epsilon(row) for row in points]
+
+    loops: dict[str, Callable[[FloatArray], Any]] = {
+        "lin_extr": lin_loop,
+        "rich_extr": rich_loop,
+        "epsilon": epsilon_loop,
+        "zne_extr/linear": functools.partial(ex.zne_extr, scale=scale),
+        "zne_extr/richardson": functools.partial(ex.zne_extr, scale=scale,
+                                                 method="richardson"),
+        "epsilon_batch": ex.epsilon_batch,
+    }
+    out = {}
+    for count in counts:
+        points = rng.uniform(0.2, 1., size=(count, len(scale)))
+        for name, func in loops.items():
+            out[f"extrapolation/{name}/n={count}/obs_per_s"] = \
+                count / time_call(functools.partial(func, points), repeat=3)
+    return out
+
+
+SUITES: dict[str, Callable[[], dict[str, float]]] = {
+    "integrator": bench_integrator,
+    "solver": bench_solver,
+    "scaler": bench_scaler,
+    "extrapolation": bench_extrapolation,
+}
+
+
+def run(suites: Optional[list[str]] = None) -> dict[str, Any]:
+    """Run the benchmark suites, all of them if suites is None."""
+    results: dict[str, float] = {}
+    for name in suites or list(SUITES):
+        results.update(SUITES[name]())
+    return {
+        "meta": {"python": platform.python_version(),
+                 "numpy": np.__version__,
+                 "machine": platform.machine(),
+                 "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+
+
+def compare(old: dict[str, Any],
+            new: dict[str, Any],
+            threshold: float = 0.2) -> list[str]:
+    """
+    # Regressions between two runs.
+
+    Results whose name ends with '_per_s' are rates (higher is better),
+    the other ones are times in seconds (lower is better). Returns a message
+    per benchmark slower in new than in old by more than threshold.
+    """
+    regressions = []
+    for name, new_val in new["results"].items():
+        old_val = old["results"].get(name)
+        if old_val is None:
+            continue
+        slowdown = (old_val / new_val if name.endswith("_per_s")
+                    else new_val / old_val)
+        if slowdown > 1 + threshold:
+            regressions.append(
+                f"{name}: {old_val:.4g} -> {new_val:.4g} "
+                f"({slowdown:.2f}x slower)"
+            )
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("-o", "--output", default="bench_output.json",
+                        help="json file the results are written to")
+    parser.add_argument("--suite", action="append", choices=list(SUITES),
+                        help="suite to run, may be repeated, all by default")
+    parser.add_argument("--compare", metavar="OLD",
+                        help="json file of a previous run to compare to")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown flagged as a regression")
+    args = parser.parse_args(argv)
+    new = run(args.suite)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(new, file, indent=2)
+    for name, val in new["results"].items():
+        print(f"{name}: {val:.4g}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            old = json.load(file)
+        regressions = compare(old, new, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
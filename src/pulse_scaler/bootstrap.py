@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module bootstrap.
+
+Error bars of zero noise estimates, for many observables at once.
+The results of one circuit are given as the outcomes and weights of every
+scale factor, see pulse_scaler.marginals.result_arrays, and the
+observables as bit masks, see pulse_scaler.marginals.pauli_masks. Only the
+outcomes observed at least once are kept, so the size of the arrays is
+bounded by the shots, whatever the number of bits.
+
+- bootstrap_zne draws the multinomial resamples of the counts in arrays
+  resamples x scale factors x outcomes, evaluates every observable on the
+  same draws, so that the estimates of the observables keep their
+  correlations, and extrapolates all of them with one batched call.
+- analytic_zne propagates the shot noise through the weights of the
+  linear extrapolations, with the delta method for the exponential fit.
+
+    arrays = [result_arrays(result) for result in results]
+    interval = bootstrap_zne(arrays, [1, 2, 3], pauli_masks(["ZZ"]))
+    print(interval.estimate, interval.low, interval.high)
+"""
+from typing import Any, NamedTuple, Optional, Sequence
+import numpy as np
+from scipy.stats import norm
+import pulse_scaler.extrapolation as ex
+from pulse_scaler.instrumentation import timed
+from pulse_scaler.marginals import ALL_BITS, UIntArray, parity_signs
+from pulse_scaler.pulse_areas import FloatArray
+
+IntArray = np.ndarray
+OutcomeArrays = Sequence[tuple[Any, Any]]
+
+# Largest number of counts drawn at once, resamples x scale factors x
+# outcomes, 128 MB of 64 bits integers.
+RESAMPLE_BLOCK = 2 ** 24
+
+
+class ZneInterval(NamedTuple):
+    """Zero noise estimates with their error bars, one per observable."""
+
+    estimate: FloatArray
+    stderr: FloatArray
+    low: FloatArray
+    high: FloatArray
+
+
+def outcome_counts(arrays: OutcomeArrays) -> tuple[UIntArray, IntArray]:
+    """
+    # Counts of every scale factor on the observed outcomes.
+
+    arrays holds the outcomes and weights of every scale factor. Returns
+    the union of their outcomes and the counts, scale factors x outcomes.
+    """
+    outcomes = np.unique(np.concatenate(
+        [np.asarray(outs, dtype=np.uint64) for outs, _ in arrays]))
+    counts = np.zeros((len(arrays), len(outcomes)), dtype=np.int64)
+    for row, (outs, weights) in enumerate(arrays):
+        weights = np.asarray(weights)
+        if not np.issubdtype(weights.dtype, np.integer):
+            raise ValueError("The weights of the outcomes must be integers.")
+        np.add.at(counts[row],
+                  np.searchsorted(outcomes,
+                                  np.asarray(outs, dtype=np.uint64)),
+                  weights)
+    return outcomes, counts
+
+
+def expectation_values(counts: IntArray,
+                       eigenvalues: FloatArray) -> FloatArray:
+    """
+    # Expectation values of counts.
+
+    counts is ... x scale factors x outcomes and eigenvalues outcomes or
+    observables x outcomes. Returns ... x observables x scale factors.
+    """
+    counts = np.asarray(counts)
+    eigenvalues = np.atleast_2d(np.asarray(eigenvalues, dtype=float))
+    out: FloatArray = (np.einsum("...so,mo->...ms", counts, eigenvalues)
+                       / counts.sum(axis=-1)[..., np.newaxis, :])
+    return out
+
+
+def extrapolate(points: FloatArray,
+                scale: FloatArray,
+                method: str = "linear",
+                order: int = 2) -> FloatArray:
+    """
+    # Zero noise estimates of points of any leading shape.
+
+    points is ... x scale factors, flattened into a single call of
+    zne_extr, or of epsilon_batch for method 'epsilon'.
+    """
+    points = np.asarray(points, dtype=float)
+    flat = points.reshape(-1, points.shape[-1])
+    if method == "epsilon":
+        zne = ex.epsilon_batch(flat)
+    else:
+        zne = ex.zne_extr(flat, scale, method, order)
+    out: FloatArray = np.asarray(zne).reshape(points.shape[:-1])
+    return out
+
+
+def _check_counts(arrays: OutcomeArrays,
+                  scale: FloatArray,
+                  masks: Any) -> tuple[IntArray, FloatArray]:
+    """Return the counts of arrays and the signs of masks on outcomes."""
+    if len(arrays) != len(scale):
+        errmess = "Argument 'arrays' needs one result per scale factor."
+        raise ValueError(errmess)
+    outcomes, counts = outcome_counts(arrays)
+    if np.any(counts.sum(axis=-1) <= 0):
+        raise ValueError("Every scale factor needs at least one shot.")
+    masks = np.atleast_1d(np.asarray(masks, dtype=np.uint64))
+    return counts, parity_signs(outcomes, masks)
+
+
+def _resampled_expvals(counts: IntArray,
+                       eigenvalues: FloatArray,
+                       n_resamples: int,
+                       seed: Optional[int]) -> FloatArray:
+    """Return the expectation values of resamples, drawn by blocks."""
+    shots = counts.sum(axis=-1)
+    probs = counts / shots[:, np.newaxis]
+    rng = np.random.default_rng(seed)
+    block = max(1, RESAMPLE_BLOCK // counts.size)
+    return np.concatenate([
+        expectation_values(rng.multinomial(
+            shots, probs, size=(min(block, n_resamples - start),
+                                len(shots))), eigenvalues)
+        for start in range(0, n_resamples, block)])
+
+
+@timed("bootstrap/bootstrap_zne")
+def bootstrap_zne(arrays: OutcomeArrays,
+                  scale: FloatArray,
+                  masks: Any = ALL_BITS,
+                  method: str = "linear",
+                  order: int = 2,
+                  n_resamples: int = 1000,
+                  confidence: float = 0.95,
+                  seed: Optional[int] = None) -> ZneInterval:
+    """
+    # Bootstrap error bars.
+
+    params:
+        arrays: outcomes and weights of every scale factor, see
+            pulse_scaler.marginals.result_arrays.
+        scale: scale factors.
+        masks: observables, Z on every bit by default.
+        method: 'linear', 'richardson', 'poly', 'exp' or 'epsilon'.
+        order: order of the 'poly' fit.
+        n_resamples: number of multinomial resamples.
+        confidence: confidence level of the percentile interval.
+        seed: seed of the resamples.
+    Returns the estimate of the counts, the standard deviation of the
+    resampled estimates and the percentile interval.
+    """
+    # pylint: disable=too-many-arguments
+    scale = np.asarray(scale, dtype=float)
+    counts, eigenvalues = _check_counts(arrays, scale, masks)
+    zne = extrapolate(_resampled_expvals(counts, eigenvalues, n_resamples,
+                                         seed), scale, method, order)
+    estimate = extrapolate(expectation_values(counts, eigenvalues), scale,
+                           method, order)
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(zne, [tail, 1 - tail], axis=0)
+    return ZneInterval(estimate, zne.std(axis=0, ddof=1), low, high)
+
+
+@timed("bootstrap/analytic_zne")
+def analytic_zne(arrays: OutcomeArrays,
+                 scale: FloatArray,
+                 masks: Any = ALL_BITS,
+                 method: str = "linear",
+                 order: int = 2,
+                 confidence: float = 0.95) -> ZneInterval:
+    """
+    # Error bars propagated from the shot noise.
+
+    The variance of every point is the variance of the eigenvalues over
+    its counts divided by its shots, propagated through the weights of
+    zne_weights, on the logarithm of the points for 'exp'. The interval is
+    normal. Same arguments as bootstrap_zne, without 'epsilon'.
+    """
+    # pylint: disable=too-many-arguments
+    if method == "epsilon":
+        raise ValueError("The epsilon algorithm needs bootstrap_zne.")
+    scale = np.asarray(scale, dtype=float)
+    counts, eigenvalues = _check_counts(arrays, scale, masks)
+    mean = expectation_values(counts, eigenvalues)
+    # The eigenvalues are +-1, their squares average to one.
+    variances = (1 - mean ** 2) / counts.sum(axis=-1)
+    estimate = extrapolate(mean, scale, method, order)
+    weights = ex.zne_weights(scale, method, order)
+    if method == "exp":
+        stderr = np.abs(estimate) * np.sqrt(variances / mean ** 2
+                                            @ weights ** 2)
+    else:
+        stderr = np.sqrt(variances @ weights ** 2)
+    half = norm.ppf((1 + confidence) / 2) * stderr
+    return ZneInterval(estimate, stderr, estimate - half, estimate + half)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module envelopes.
+
+Samples the gaussian family of qiskit pulses on the dt grid with NumPy.
+The samples follow qiskit's convention exactly: the envelope is evaluated
+at the middle of every sample, t = k + 1/2, and the gaussians are lifted to
+be zero one sample before and after the pulse (zeroed_width = duration + 2)
+then rescaled so that their peak stays at amp.
+
+Areas computed as sums of samples are the areas the hardware plays, which
+differs slightly from the continuous integrals of pulse_scaler.pulse_areas.
+
+stretch_samples stretches any sampled envelope, for the pulses without a
+closed form.
+"""
+from typing import Any, Optional
+import numpy as np
+from pulse_scaler.pulse_areas import FloatArray, ComplexArray, SHAPES
+
+
+def sample_times(dur: int) -> FloatArray:
+    """Middle of every sample of a pulse of duration dur."""
+    out: FloatArray = np.arange(dur, dtype=np.float64) + 0.5
+    return out
+
+
+def lifted_gaussian(times: FloatArray,
+                    center: FloatArray,
+                    sig: FloatArray,
+                    edge: FloatArray) -> FloatArray:
+    """Evaluate a unit gaussian lifted to zero at a distance edge."""
+    gauss = np.exp(-.5 * ((times - center) / sig) ** 2)
+    offset = np.exp(-.5 * (edge / sig) ** 2)
+    out: FloatArray = (gauss - offset) / (1 - offset)
+    return out
+
+
+def gaussian_samples(dur: int, amp: complex, sig: float) -> ComplexArray:
+    """Return the samples of qiskit.pulse.Gaussian."""
+    out: ComplexArray = sample_pulses("Gaussian", dur, amp, sig)[0]
+    return out
+
+
+def gaussian_square_samples(dur: int,
+                            amp: complex,
+                            sig: float,
+                            width: float) -> ComplexArray:
+    """Return the samples of qiskit.pulse.GaussianSquare."""
+    out: ComplexArray = sample_pulses("Gaussian_Square", dur, amp, sig,
+                                      width=width)[0]
+    return out
+
+
+def drag_samples(dur: int,
+                 amp: complex,
+                 sig: float,
+                 beta: float) -> ComplexArray:
+    """Return the samples of qiskit.pulse.Drag."""
+    out: ComplexArray = sample_pulses("Drag", dur, amp, sig, beta=beta)[0]
+    return out
+
+
+def sample_pulses(shapes: np.ndarray | list[str] | str,
+                  dur: Any,
+                  amp: Any,
+                  sig: Any,
+                  width: Optional[Any] = None,
+                  beta: Optional[Any] = None) -> ComplexArray:
+    """
+    # Samples of a batch of pulses.
+
+    Returns an array pulses x max(dur), every row is padded with zeros
+    after the end of its pulse.
+
+    params:
+        shapes: name of each pulse shape, one of SHAPES.
+        dur, amp, sig: parameters of the pulses.
+        width: widths of the pulses, only read for 'Gaussian_Square'.
+        beta: betas of the pulses, only read for 'Drag'.
+    """
+    # pylint: disable=too-many-arguments, too-many-locals
+    shapes, dur, amp, sig, width, beta = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(shapes)),
+        np.rint(np.asarray(dur, dtype=float)).astype(int),
+        np.asarray(amp, dtype=complex),
+        np.asarray(sig, dtype=float),
+        np.asarray(0. if width is None else width, dtype=float),
+        np.asarray(0. if beta is None else beta, dtype=float)
+    )
+    unknown = ~np.isin(shapes, SHAPES)
+    if np.any(unknown):
+        errmess = f"Unsupported pulse shapes: {set(shapes[unknown])}"
+        raise ValueError(errmess)
+    shapes, dur, amp, sig, width, beta = (
+        arr.ravel()[:, np.newaxis]
+        for arr in (shapes, dur, amp, sig, width, beta)
+    )
+    times = sample_times(int(dur.max(initial=0)))[np.newaxis, :]
+    center = dur / 2
+    gauss = lifted_gaussian(times, center, sig, center + 1)
+    drag = gauss * (1 - 1j * beta * (times - center) / sig ** 2)
+    start, stop = center - width / 2, center + width / 2
+    edge = (dur - width) / 2 + 1
+    square = np.where(times <= start,
+                      lifted_gaussian(times, start, sig, edge),
+                      np.where(times >= stop,
+                               lifted_gaussian(times, stop, sig, edge),
+                               1.))
+    envelope = np.select([shapes == "Gaussian_Square", shapes == "Drag"],
+                         [square, drag], gauss)
+    out: ComplexArray = np.where(times < dur, amp * envelope, 0)
+    return out
+
+
+def sampled_norm_areas(shapes: np.ndarray | list[str] | str,
+                       dur: Any,
+                       sig: Any,
+                       width: Optional[Any] = None) -> FloatArray:
+    """
+    # Sums of the samples of a batch of unit amplitude pulses.
+
+    Discrete counterpart of pulse_scaler.pulse_areas.normalized_areas,
+    with the same broadcasting. The drag derivative term sums to zero on the
+    symmetric sample grid, so only the real part is kept.
+    """
+    dur, sig = np.asarray(dur), np.asarray(sig)
+    shape = np.broadcast_shapes(np.shape(shapes), dur.shape, sig.shape,
+                                np.shape(width) if width is not None else ())
+    samples = sample_pulses(shapes, dur, 1., sig, width=width)
+    out: FloatArray = samples.real.sum(axis=-1).reshape(shape)
+    return out
+
+
+def stretch_samples(samples: Any, dur: int, tiny: float = 1e-9
+                    ) -> ComplexArray:
+    """
+    # Samples of a pulse stretched to duration dur.
+
+    The envelope is linearly interpolated at the middle of the new samples,
+    then multiplied by one complex factor so that the sum of the samples,
+    the area played on the dt grid, stays exactly the same. Envelopes whose
+    area is zero, up to tiny times the sum of the magnitudes, are only
+    scaled by the inverse of the stretch.
+    """
+    samples = np.asarray(samples, dtype=complex)
+    if dur < 1 or len(samples) == 0:
+        raise ValueError("Can't stretch to or from an empty pulse.")
+    times = sample_times(dur) * (len(samples) / dur)
+    out: ComplexArray = np.interp(times, sample_times(len(samples)), samples)
+    new_area = out.sum()
+    if abs(new_area) > tiny * np.abs(out).sum():
+        out *= samples.sum() / new_area
+    else:
+        out *= len(samples) / dur
+    return out
@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module executor.
+
+Submits the schedules of every circuit and scale factor at once with
+asyncio and collects the results concurrently, with at most
+max_concurrency jobs in flight and failed jobs resubmitted up to retries
+times. The results are combined back into one expectation value vector
+per circuit, ready for pulse_scaler.extrapolation.
+With packed=True, the experiments of every circuit and scale factor are
+packed into multi-experiment jobs of at most max_experiments experiments,
+paying the submission and queue overhead once per job instead of once per
+experiment. Each experiment can run its own number of shots, as split by
+pulse_scaler.extrapolation.allocate_shots.
+
+    expvals = execute_scaled(scheds, [1, 2, 3])
+    estimates = zne_extr(expvals, [1, 2, 3])
+"""
+import asyncio
+from typing import Any, Callable, Optional, Sequence
+import numpy as np
+import pulse_scaler.backends.load_ibmq as cons
+from pulse_scaler.extrapolation import allocate_shots
+from pulse_scaler.instrumentation import count, stage
+from pulse_scaler.pipeline import ExpvalFunc, parity_expval
+from pulse_scaler.pulse_areas import FloatArray
+from pulse_scaler.pulse_cache import PulseCache
+from pulse_scaler.qubit_scaling import qubit_scaler_many
+
+
+class ExperimentResult:
+    """One experiment of a multi-experiment result."""
+
+    __slots__ = ("result", "experiment")
+
+    def __init__(self, result: Any, experiment: int) -> None:
+        """View the experiment of index experiment of result."""
+        self.result = result
+        self.experiment = experiment
+
+    @property
+    def success(self) -> bool:
+        """Whether the job of the experiment succeeded."""
+        return bool(getattr(self.result, "success", True))
+
+    def get_counts(self, experiment: int = 0) -> Any:
+        """Return the counts of the experiment."""
+        return self.result.get_counts(self.experiment + experiment)
+
+    def get_memory(self, experiment: int = 0) -> Any:
+        """Return the memory of the experiment."""
+        return self.result.get_memory(self.experiment + experiment)
+
+
+# Shots of every experiment, nested like the experiments.
+ShotTable = Sequence[Sequence[int]]
+# Called with (circuit, experiment, result) as soon as a result arrives.
+ResultCallback = Callable[[int, int, Any], None]
+
+
+def pack_experiments(experiments: Sequence[Sequence[Any]],
+                     max_experiments: int,
+                     shot_table: Optional[ShotTable] = None
+                     ) -> list[list[tuple[int, int]]]:
+    """
+    Split the (circuit, experiment) indices in jobs of max_experiments.
+
+    With shot_table, every job only holds experiments of the same shots,
+    a job runs a single number of shots. Shots split by allocate_shots
+    differ at every scale factor, so packing them saves little: there are
+    at least as many jobs as distinct shots.
+    """
+    if max_experiments < 1:
+        raise ValueError("Argument 'max_experiments' must be at least 1.")
+    groups: dict[Optional[int], list[tuple[int, int]]] = {}
+    for circ, row in enumerate(experiments):
+        for exp in range(len(row)):
+            shots = None if shot_table is None \
+                else int(shot_table[circ][exp])
+            groups.setdefault(shots, []).append((circ, exp))
+    return [group[start:start + max_experiments]
+            for group in groups.values()
+            for start in range(0, len(group), max_experiments)]
+
+
+def _check_shots(experiments: Sequence[Sequence[Any]],
+                 shot_table: Optional[ShotTable]) -> None:
+    """Raise a ValueError if shot_table isn't nested like experiments."""
+    if shot_table is not None and [len(row) for row in shot_table] != \
+            [len(row) for row in experiments]:
+        errmess = "Argument 'shot_table' must be nested like experiments."
+        raise ValueError(errmess)
+
+
+def _nest(results: Sequence[Any],
+          experiments: Sequence[Sequence[Any]]) -> list[list[Any]]:
+    """Nest a flat list of results like experiments."""
+    out: list[list[Any]] = []
+    start = 0
+    for row in experiments:
+        out.append(list(results[start:start + len(row)]))
+        start += len(row)
+    return out
+
+
+async def run_job(backend: Any,
+                  experiment: Any,
+                  semaphore: asyncio.Semaphore,
+                  retries: int = 2,
+                  poll_interval: float = 0.05,
+                  **run_options: Any) -> Any:
+    """
+    # One job.
+
+    Submits experiment once a slot of semaphore is free, polls the job
+    until it ends and returns its result. A job whose submission or result
+    raises, or whose result is not successful, is submitted again up to
+    retries times.
+    """
+    # pylint: disable=broad-except
+    error: Optional[BaseException] = None
+    async with semaphore:
+        for attempt in range(retries + 1):
+            if attempt:
+                count("job_retries")
+            try:
+                # Timed per job, the totals of concurrent jobs overlap.
+                with stage("backend/submit"):
+                    job = await asyncio.to_thread(backend.run, experiment,
+                                                  **run_options)
+                while not job.in_final_state():
+                    await asyncio.sleep(poll_interval)
+                result = await asyncio.to_thread(job.result)
+                if getattr(result, "success", True):
+                    return result
+                error = RuntimeError(f"Unsuccessful result: {result}")
+            except Exception as err:
+                error = err
+    errmess = f"Job failed after {retries + 1} submissions."
+    raise RuntimeError(errmess) from error
+
+
+async def collect_results(experiments: Sequence[Sequence[Any]],
+                          backend: Any,
+                          max_concurrency: int = 8,
+                          retries: int = 2,
+                          poll_interval: float = 0.05,
+                          shot_table: Optional[ShotTable] = None,
+                          on_result: Optional[ResultCallback] = None,
+                          **run_options: Any) -> list[list[Any]]:
+    """
+    # Results of every experiment.
+
+    Submits every experiment of every circuit concurrently and returns the
+    results with the same nesting as experiments. shot_table, nested like
+    experiments, overrides the shots of every experiment. on_result is
+    called with every result as soon as it arrives, so the results of a
+    run that fails midway aren't all lost.
+    """
+    # pylint: disable=too-many-arguments
+    if max_concurrency < 1:
+        raise ValueError("Argument 'max_concurrency' must be at least 1.")
+    _check_shots(experiments, shot_table)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    indices = [(circ, exp) for circ, row in enumerate(experiments)
+               for exp in range(len(row))]
+    options = [run_options] * len(indices) if shot_table is None else \
+        [{**run_options, "shots": int(n)} for row in shot_table for n in row]
+
+    async def job(circ: int, exp: int, option: dict[str, Any]) -> Any:
+        """Run one experiment and report its result."""
+        result = await run_job(backend, experiments[circ][exp], semaphore,
+                               retries, poll_interval, **option)
+        if on_result is not None:
+            on_result(circ, exp, result)
+        return result
+
+    results = await asyncio.gather(*(
+        job(circ, exp, option)
+        for (circ, exp), option in zip(indices, options)
+    ))
+    return _nest(results, experiments)
+
+
+def _unpack(packs: list[list[tuple[int, int]]],
+            results: Sequence[Any],
+            experiments: Sequence[Sequence[Any]]
+            ) -> list[list[ExperimentResult]]:
+    """Nest the experiments of the results of packs like experiments."""
+    out: list[list[Any]] = [[None] * len(row) for row in experiments]
+    for pack, result in zip(packs, results):
+        for position, (circ, exp) in enumerate(pack):
+            out[circ][exp] = ExperimentResult(result, position)
+    return out
+
+
+async def collect_packed(experiments: Sequence[Sequence[Any]],
+                         backend: Any,
+                         max_experiments: int,
+                         max_concurrency: int = 8,
+                         retries: int = 2,
+                         poll_interval: float = 0.05,
+                         shot_table: Optional[ShotTable] = None,
+                         on_result: Optional[ResultCallback] = None,
+                         **run_options: Any) -> list[list[ExperimentResult]]:
+    """
+    # Results of every experiment, packed in multi-experiment jobs.
+
+    Same as collect_results, but every job holds up to max_experiments
+    experiments of the same shots and the results are unpacked as
+    ExperimentResult.
+    """
+    # pylint: disable=too-many-arguments
+    _check_shots(experiments, shot_table)
+    packs = pack_experiments(experiments, max_experiments, shot_table)
+    count("experiments_packed", sum(len(pack) for pack in packs))
+
+    def unpack(_: int, index: int, result: Any) -> None:
+        """Report every experiment of a finished job."""
+        if on_result is not None:
+            for position, (circ, exp) in enumerate(packs[index]):
+                on_result(circ, exp, ExperimentResult(result, position))
+
+    results = await collect_results(
+        [[[experiments[circ][exp] for circ, exp in pack] for pack in packs]],
+        backend, max_concurrency, retries, poll_interval,
+        shot_table=None if shot_table is None else
+        [[shot_table[pack[0][0]][pack[0][1]] for pack in packs]],
+        on_result=unpack, **run_options
+    )
+    return _unpack(packs, results[0], experiments)
+
+
+def run_all(experiments: Sequence[Sequence[Any]],
+            backend: Optional[Any] = None,
+            max_concurrency: int = 8,
+            retries: int = 2,
+            poll_interval: float = 0.05,
+            packed: bool = False,
+            max_experiments: Optional[int] = None,
+            shot_table: Optional[ShotTable] = None,
+            on_result: Optional[ResultCallback] = None,
+            **run_options: Any) -> list[list[Any]]:
+    """
+    # Blocking collect_results.
+
+    Runs on cons.BACKEND by default with the seeds and shots of
+    pulse_scaler.backends.load_ibmq. With packed, the experiments are
+    sent through collect_packed in jobs of max_experiments experiments,
+    cons.CONFIG.max_experiments if None. shot_table gives the shots of
+    every experiment, from allocate_shots for example, and on_result is
+    called with every result as it arrives. The jobs are polled every
+    poll_interval seconds.
+    """
+    # pylint: disable=too-many-arguments
+    backend = cons.BACKEND if backend is None else backend
+    run_options.setdefault("meas_return", "avg")
+    run_options.setdefault("seed_simulator", cons.SEED)
+    run_options.setdefault("shots", cons.SHOTS)
+    if packed:
+        if max_experiments is None:
+            max_experiments = int(cons.CONFIG.max_experiments)
+        return asyncio.run(collect_packed(experiments, backend,
+                                          max_experiments, max_concurrency,
+                                          retries, poll_interval,
+                                          shot_table=shot_table,
+                                          on_result=on_result,
+                                          **run_options))
+    return asyncio.run(collect_results(experiments, backend, max_concurrency,
+                                       retries, poll_interval,
+                                       shot_table=shot_table,
+                                       on_result=on_result,
+                                       **run_options))
+
+
+def expval_vectors(results: Sequence[Sequence[Any]],
+                   expval: ExpvalFunc = parity_expval) -> FloatArray:
+    """Return the expectation values as an array circuits x experiments."""
+    out: FloatArray = np.array([[expval(result, 0) for result in row]
+                                for row in results], dtype=float)
+    return out
+
+
+def execute_scaled(scheds: Sequence[Any],
+                   scale_factors: Sequence[float],
+                   backend: Optional[Any] = None,
+                   expval: ExpvalFunc = parity_expval,
+                   cache: Optional[PulseCache] = None,
+                   shot_budget: Optional[int] = None,
+                   method: str = "linear",
+                   **options: Any) -> FloatArray:
+    """
+    # Expectation values of scaled schedules.
+
+    Scales every schedule of scheds by every factor of scale_factors, runs
+    all of them concurrently and returns the expectation values as an
+    array schedules x scale factors.
+
+    params:
+        scheds: schedules without measurement.
+        scale_factors: scale factors, 1 runs the unscaled schedule.
+        backend: backend to run on, cons.BACKEND if None.
+        expval: expectation value of a result.
+        cache: PulseCache of the scaled amplitudes.
+        shot_budget: shots of each circuit, split between the scale
+            factors by allocate_shots for method if given.
+        method: extrapolation method the shots are allocated for.
+        options: max_concurrency, retries, poll_interval, packed,
+            max_experiments and options of backend.run.
+    """
+    # pylint: disable=too-many-arguments
+    scaled = [qubit_scaler_many(sched, scale_factors, cache)
+              for sched in scheds]
+    if shot_budget is not None:
+        split = allocate_shots(list(scale_factors), shot_budget,
+                               method).tolist()
+        options["shot_table"] = [split] * len(scheds)
+    return expval_vectors(run_all(scaled, backend, **options), expval)
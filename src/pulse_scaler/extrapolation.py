@@ -1,64 +1,246 @@
 #!/usr/bin/env python
 # -*- coding-UFT-8 -*-
 """Regroups all the necessary utils for the extrapolations."""
-from typing import cast
+from typing import Optional
 import numpy as np
+import numpy.typing as npt
+from pulse_scaler.instrumentation import timed
+from pulse_scaler.pulse_areas import FloatArray
 
-FloatList = list[float] | np.ndarray[float, np.dtype[np.float64]]
+IntArray = npt.NDArray[np.int64]
 
 
-def lin_extr(
-        points: np.ndarray[float, np.dtype[np.float64]],
-        scale: np.ndarray[float, np.dtype[np.float64]]) -> float:
+@timed("extrapolation/lin_extr")
+def lin_extr(points: npt.ArrayLike, scale: npt.ArrayLike) -> float:
     """Linear extrapolator."""
+    points = np.asarray(points, dtype=float)
+    scale = np.asarray(scale, dtype=float)
     if len(points) != len(scale):
         raise ValueError("Incorrect length of points.")
-    zne_expval: float = np.polyfit(scale, points, 1)[-1]
-    return zne_expval
+    return float(np.polyfit(scale, points, 1)[-1])
 
 
-def epsilon(
-        epsilon_0: FloatList,
-        epsilon_m1: FloatList | None = None,
-        normal_expval: float | None = None) -> float:
+def epsilon_table(points: npt.ArrayLike, tiny: float = 1e-12) -> FloatArray:
+    """
+    # Table de l'algorithme epsilon.
+
+    Construit la table de Wynn de chaque série de points en une fois.
+    Param: points: séries à faire converger, une par ligne (m x n).
+    Param: tiny: les différences plus petites que tiny donnent une entrée
+        infinie au lieu d'une division par zéro, la série a convergé.
+    Retour: table (m x n+1 x n), la ligne k+1 contient epsilon_k, la
+        ligne 0 epsilon_-1 = 0. Les entrées hors du triangle sont NaN.
+    """
+    points = np.atleast_2d(np.asarray(points, dtype=float))
+    n_obs, n_pts = points.shape
+    table: FloatArray = np.full((n_obs, n_pts + 1, n_pts), np.nan)
+    table[:, 0, :] = 0
+    table[:, 1, :] = points
+    with np.errstate(over="ignore", invalid="ignore"):
+        for row in range(2, n_pts + 1):
+            length = n_pts - row + 1
+            delta = table[:, row - 1, 1:length + 1] \
+                - table[:, row - 1, :length]
+            inverse = np.divide(1.0, delta,
+                                out=np.full_like(delta, np.inf),
+                                where=np.abs(delta) >= tiny)
+            table[:, row, :length] = table[:, row - 2, 1:length + 1] \
+                + inverse
+    return table
+
+
+@timed("extrapolation/epsilon_batch")
+def epsilon_batch(points: npt.ArrayLike, tiny: float = 1e-12) -> FloatArray:
+    """
+    # Algorithme epsilon sur plusieurs séries.
+
+    Retourne la valeur à laquelle chaque ligne de points converge, soit la
+    dernière entrée d'une colonne paire de la table de Wynn. Si elle n'est
+    pas finie, la colonne paire précédente est utilisée.
+    Param: points: séries à faire converger, une par ligne (m x n).
+    Param: tiny: plus petite différence utilisée, voir epsilon_table.
+    Retour: valeurs auxquelles les séries convergent (m).
+    """
+    table = epsilon_table(points, tiny)
+    n_pts = table.shape[2]
+    rows = range(n_pts if n_pts % 2 else n_pts - 1, 0, -2)
+    candidates = np.stack([table[:, row, n_pts - row] for row in rows],
+                          axis=1)
+    first_finite = np.argmax(np.isfinite(candidates), axis=1)
+    out: FloatArray = candidates[np.arange(len(candidates)), first_finite]
+    return out
+
+
+def epsilon(epsilon_0: npt.ArrayLike, tiny: float = 1e-12) -> float:
     """
     # Algorithme epsilon.
 
-    Retourne la valeur à laquelle une série converge. Le paramètre
-    epsilon_m1 est pour garder en mémoire la série précédente et
-    n'est pas nécessaire à définir pour l'utilisation usuelle de la fonction.
+    Retourne la valeur à laquelle une série converge.
     Param: epsilon_0: Série initiale à faire converger.
-    Param: epsilon_m1: Série précédente à l'itération actuelle.
-    Param: normal_expval: Valeur de l'itération initiale, do not set.
+    Param: tiny: plus petite différence utilisée, voir epsilon_table.
     Retour: float: valeur à laquelle la série converge.
     """
-    if epsilon_m1 is None:  # S'il s'agit de la première itération.
-        epsilon_m1 = [0 for _ in epsilon_0]
-        normal_expval = epsilon_0[0]
-    if len(epsilon_0) <= 1:  # Briser la récursivité.
-        normal_expval = cast(float, normal_expval)
-        epsilon_0 = cast(list[float], epsilon_0)
-        return (float(epsilon_0) + normal_expval) / 2
-    # Initiallise le tableau de la nouvelle série.
-    epsilon_1: np.ndarray[float, np.dtype[np.float64]] = np.array([])
-
-    # Itère une fois de moins que le nombre d'éléments
-    for i in range(len(epsilon_0) - 1):
-        # Génère la nouvelle série
-        delta = epsilon_0[i + 1] - epsilon_0[i]
-        epsilon_1 = np.append(epsilon_1, epsilon_m1[i + 1] + (1.0 / delta))
-
-    # Faire un itération de epsilon avec la nouvelle série obtenue.
-    return epsilon(epsilon_1, epsilon_0, normal_expval)
-
-
-def rich_extr(points: list[float], scale: list[int]) -> float:
+    return float(epsilon_batch(np.asarray(epsilon_0)[np.newaxis], tiny)[0])
+
+
+@timed("extrapolation/rich_extr")
+def rich_extr(points: npt.ArrayLike, scale: npt.ArrayLike) -> float:
     """Richardson extrapolator."""
+    points = np.asarray(points, dtype=float)
     order = len(points) - 1
-    zne_expval: float = np.polyfit(scale, points, deg=order)[-1]
-    return zne_expval
+    return float(np.polyfit(np.asarray(scale, dtype=float), points,
+                            deg=order)[-1])
 
 
-def poly_extr(points: list[float], scale: list[int], order: int = 2) -> float:
+@timed("extrapolation/poly_extr")
+def poly_extr(points: npt.ArrayLike,
+              scale: npt.ArrayLike,
+              order: int = 2) -> float:
     """Polynomial extrapolator."""
-    raise NotImplementedError
+    points = np.asarray(points, dtype=float)
+    scale = np.asarray(scale, dtype=float)
+    if len(points) != len(scale):
+        raise ValueError("Incorrect length of points.")
+    if order >= len(points):
+        raise ValueError("Not enough points for the order of the fit.")
+    return float(np.polyfit(scale, points, deg=order)[-1])
+
+
+def exp_extr(points: npt.ArrayLike, scale: npt.ArrayLike) -> float:
+    """Exponential extrapolator, fits points = a * exp(b * scale)."""
+    return float(zne_extr(np.asarray(points)[np.newaxis], scale, "exp")[0])
+
+
+def fit_order(method: str, n_points: int, order: int = 2) -> int:
+    """Order of the polynomial fitted by an extrapolation method."""
+    if method in ("linear", "exp"):
+        return 1
+    if method == "richardson":
+        return n_points - 1
+    if method == "poly":
+        return order
+    raise ValueError(f"Unknown extrapolation method '{method}'.")
+
+
+def zne_weights(scale: npt.ArrayLike,
+                method: str = "linear",
+                order: int = 2) -> FloatArray:
+    """
+    # Weights of a linear extrapolation.
+
+    Returns w such that points @ w is the zero noise estimate of points
+    measured at scale. For the exponential fit, the weights apply to the
+    logarithm of the points. Computed once per scale vector.
+    """
+    scale = np.asarray(scale, dtype=float)
+    deg = fit_order(method, len(scale), order)
+    if deg >= len(scale):
+        raise ValueError("Not enough points for the order of the fit.")
+    if method == "richardson":
+        # Lagrange interpolation weights at zero.
+        diff = scale[np.newaxis, :] - scale[:, np.newaxis]
+        np.fill_diagonal(diff, 1.)
+        num = np.where(np.eye(len(scale)), 1., scale[np.newaxis, :])
+        out: FloatArray = np.prod(num / diff, axis=1)
+        return out
+    vander = np.vander(scale, deg + 1, increasing=True)
+    out = np.linalg.pinv(vander)[0]
+    return out
+
+
+@timed("extrapolation/zne_extr")
+def zne_extr(points: npt.ArrayLike,
+             scale: npt.ArrayLike,
+             method: str = "linear",
+             order: int = 2,
+             variances: Optional[npt.ArrayLike] = None) -> FloatArray:
+    """
+    # Batched zero noise extrapolation.
+
+    Extrapolates every observable in one matrix product.
+    params:
+        points: expectation values, observables x scale factors.
+        scale: scale factors.
+        method: 'linear', 'richardson', 'poly' or 'exp'.
+        order: order of the 'poly' fit.
+        variances: shot noise variance of each point, same shape as
+            points. The fits are then weighted by the inverse variances.
+    Returns the zero noise estimate of each observable.
+    """
+    # pylint: disable=too-many-arguments
+    values: FloatArray = np.atleast_2d(np.asarray(points, dtype=float))
+    factors: FloatArray = np.asarray(scale, dtype=float)
+    if values.shape[1] != len(factors):
+        raise ValueError("Incorrect length of points.")
+    sign: FloatArray = np.ones((len(values), 1))
+    var = None if variances is None \
+        else np.broadcast_to(np.asarray(variances, dtype=float), values.shape)
+    if method == "exp":
+        sign = np.sign(values[:, :1])
+        if np.any(sign * values <= 0):
+            raise ValueError("Exponential fit needs points of the same sign.")
+        if var is not None:
+            var = var / values ** 2
+        values = np.log(sign * values)
+    if var is None:
+        zne: FloatArray = values @ zne_weights(factors, method, order)
+    else:
+        deg = fit_order(method, len(factors), order)
+        vander = np.vander(factors, deg + 1, increasing=True)
+        inv_var = 1 / var
+        normal = np.einsum("ni,mn,nj->mij", vander, inv_var, vander)
+        rhs = np.einsum("ni,mn,mn->mi", vander, inv_var, values)
+        zne = np.linalg.solve(normal, rhs[..., np.newaxis])[:, 0, 0]
+    if method == "exp":
+        zne = sign[:, 0] * np.exp(zne)
+    return zne
+
+
+def estimator_variance(scale: npt.ArrayLike,
+                       shots: npt.ArrayLike,
+                       method: str = "linear",
+                       order: int = 2,
+                       stddevs: Optional[npt.ArrayLike] = None) -> float:
+    """
+    # Shot noise variance of the zero noise estimate.
+
+    sum_i w_i^2 sigma_i^2 / N_i, with w the weights of zne_weights, N the
+    shots and sigma the per shot standard deviations at every scale factor,
+    1 if None. For the exponential fit, stddevs are those of the logarithm
+    of the points.
+    """
+    weights = zne_weights(scale, method, order)
+    stddevs = np.ones(len(weights)) if stddevs is None else stddevs
+    return float(np.sum(weights ** 2 * np.asarray(stddevs) ** 2
+                        / np.asarray(shots, dtype=float)))
+
+
+def allocate_shots(scale: npt.ArrayLike,
+                   total_shots: int,
+                   method: str = "linear",
+                   order: int = 2,
+                   stddevs: Optional[npt.ArrayLike] = None,
+                   min_shots: int = 1) -> IntArray:
+    """
+    # Variance optimal split of total_shots between scale factors.
+
+    Minimizing estimator_variance under sum_i N_i = total_shots gives
+    N_i proportional to |w_i| sigma_i. Every scale factor gets at least
+    min_shots, the rest is split proportionally and rounded with the
+    largest remainders, so the shots sum to total_shots exactly.
+    """
+    # pylint: disable=too-many-arguments
+    weights = np.abs(zne_weights(scale, method, order))
+    if stddevs is not None:
+        weights = weights * np.abs(np.asarray(stddevs, dtype=float))
+    free = total_shots - min_shots * len(weights)
+    if free < 0:
+        raise ValueError("Argument 'total_shots' is below the minimum.")
+    if weights.sum() == 0:
+        weights = np.ones(len(weights))
+    ideal = free * weights / weights.sum()
+    shots = np.floor(ideal).astype(np.int64)
+    remainders = np.argsort(shots - ideal)[:free - shots.sum()]
+    shots[remainders] += 1
+    out: IntArray = shots + min_shots
+    return out
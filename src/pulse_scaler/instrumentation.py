@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module instrumentation.
+
+Opt-in timings and counters of the scaling pipeline.
+Nothing is recorded outside of a profiling() block, and the hooks then only
+cost a global lookup. Blocks running concurrently, in threads or asyncio
+tasks, are each timed on their own: the total of their stage adds up the
+time of every block and can exceed the wall time.
+
+    with profiling() as prof:
+        scaled = qubit_scaler_many(sched, [2, 3, 4])
+    print(prof.report())
+"""
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+import functools
+import time
+from typing import Any, Callable, ContextManager, Iterator, Optional, \
+    ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class Profile:
+    """Timings and counters recorded inside a profiling() block."""
+
+    def __init__(self) -> None:
+        """Instantiate an empty Profile."""
+        self.timings: dict[str, float] = {}
+        self.calls: Counter[str] = Counter()
+        self.counts: Counter[str] = Counter()
+
+    def add_time(self, name: str, elapsed: float) -> None:
+        """Add one call of elapsed seconds to stage name."""
+        self.timings[name] = self.timings.get(name, 0.) + elapsed
+        self.calls[name] += 1
+
+    def summary(self) -> dict[str, Any]:
+        """Return the timings, calls per stage and counters as a dict."""
+        return {
+            "stages": {name: {"time_s": total, "calls": self.calls[name]}
+                       for name, total in self.timings.items()},
+            "counts": dict(self.counts),
+        }
+
+    def report(self) -> str:
+        """Human readable summary, slowest stages first."""
+        lines = [f"{'stage':<32}{'calls':>10}{'total s':>12}{'mean ms':>12}"]
+        for name, total in sorted(self.timings.items(),
+                                  key=lambda item: -item[1]):
+            calls = self.calls[name]
+            lines.append(f"{name:<32}{calls:>10}{total:>12.4f}"
+                         f"{1e3 * total / calls:>12.4f}")
+        lines.append(f"{'counter':<32}{'count':>10}")
+        for name, value in sorted(self.counts.items()):
+            lines.append(f"{name:<32}{value:>10}")
+        return "\n".join(lines)
+
+
+_ACTIVE: Optional[Profile] = None
+
+
+@contextmanager
+def profiling() -> Iterator[Profile]:
+    """Record timings and counters for the duration of the block."""
+    # pylint: disable=global-statement
+    global _ACTIVE
+    previous, _ACTIVE = _ACTIVE, Profile()
+    try:
+        yield _ACTIVE
+    finally:
+        _ACTIVE = previous
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add value to the counter name if profiling."""
+    if _ACTIVE is not None:
+        _ACTIVE.counts[name] += value
+
+
+@contextmanager
+def _timed_block(profile: Profile, name: str) -> Iterator[None]:
+    """Time the block into profile."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_time(name, time.perf_counter() - start)
+
+
+_NULL = nullcontext()
+
+
+def stage(name: str) -> ContextManager[Any]:
+    """Time a block as stage name if profiling, do nothing otherwise."""
+    if _ACTIVE is None:
+        return _NULL
+    return _timed_block(_ACTIVE, name)
+
+
+def timed(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Time every call of the decorated function as stage name."""
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(func)
+        def inner(*args: P.args, **kwargs: P.kwargs) -> R:
+            profile = _ACTIVE
+            if profile is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.add_time(name, time.perf_counter() - start)
+        return inner
+    return decorator
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module marginals.
+
+Expectation values of many Pauli observables from counts or memory. A
+result is converted once into integer outcomes (bit k of an outcome is
+classical bit k, the rightmost character of the bitstring) and their
+weights. An observable is a bit mask, the bits its Pauli string acts on,
+and its value on an outcome is the parity of the masked bits, so all the
+observables of all the results are evaluated with bitwise operations on
+arrays. The rotations to the X or Y basis are up to the circuit.
+
+    masks = pauli_masks(["IZ", "ZI", "ZZ"])
+    points = expval_matrix(results, masks)  # observables x scale factors
+    estimates = zne_extr(points, [1, 2, 3])
+"""
+from typing import Any, Iterable, Mapping, Sequence
+import numpy as np
+from pulse_scaler.instrumentation import timed
+from pulse_scaler.pulse_areas import FloatArray
+
+# Outcomes are 64 bits unsigned integers, the mask of all the bits selects
+# them all.
+MAX_BITS = 64
+ALL_BITS = np.uint64(2 ** 64 - 1)
+
+UIntArray = np.ndarray
+
+
+def popcount(values: Any) -> UIntArray:
+    """Return the number of set bits of every unsigned 64 bits integer."""
+    values = np.asarray(values, dtype=np.uint64)
+    values = values - ((values >> np.uint64(1))
+                       & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) \
+        + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) \
+        & np.uint64(0x0F0F0F0F0F0F0F0F)
+    out: UIntArray = (values * np.uint64(0x0101010101010101)) \
+        >> np.uint64(56)
+    return out
+
+
+def parse_bitstrings(keys: Sequence[str]) -> UIntArray:
+    """
+    # Integer outcomes of bitstrings.
+
+    Registers separated by spaces are concatenated, hexadecimal keys
+    ('0x5') are accepted. Bitstrings of the same length, the usual case,
+    are converted with one array operation instead of one int() per key.
+    """
+    keys = [key.replace(" ", "") for key in keys]
+    if not keys:
+        return np.zeros(0, dtype=np.uint64)
+    errmess = f"Outcomes of more than {MAX_BITS} bits."
+    if keys[0].startswith("0x"):
+        values = [int(key, 16) for key in keys]
+        if max(values).bit_length() > MAX_BITS:
+            raise ValueError(errmess)
+        return np.array(values, dtype=np.uint64)
+    n_bits = len(keys[0])
+    if max(len(key) for key in keys) > MAX_BITS:
+        raise ValueError(errmess)
+    if any(len(key) != n_bits for key in keys):
+        return np.array([int(key, 2) for key in keys], dtype=np.uint64)
+    bits = np.frombuffer("".join(keys).encode("ascii"), dtype=np.uint8) \
+        .reshape(len(keys), n_bits) - ord("0")
+    powers = np.uint64(1) << np.arange(n_bits - 1, -1, -1, dtype=np.uint64)
+    out: UIntArray = bits.astype(np.uint64) @ powers
+    return out
+
+
+def counts_arrays(counts: Mapping[str, int]) -> tuple[UIntArray, UIntArray]:
+    """Outcomes and numbers of occurrences of a counts dictionary."""
+    outcomes = parse_bitstrings(list(counts))
+    weights = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    return outcomes, weights
+
+
+def memory_arrays(memory: Sequence[str]) -> tuple[UIntArray, UIntArray]:
+    """Distinct outcomes and numbers of occurrences of a memory list."""
+    keys, weights = np.unique(np.asarray(memory), return_counts=True)
+    return parse_bitstrings(keys.tolist()), weights
+
+
+def pauli_masks(paulis: Iterable[str]) -> UIntArray:
+    """Masks of the bits Pauli strings act on, rightmost letter bit 0."""
+    masks = []
+    for pauli in paulis:
+        if len(pauli) > MAX_BITS or set(pauli) - set("IXYZ"):
+            raise ValueError(f"Invalid Pauli string '{pauli}'.")
+        masks.append(int("".join("0" if letter == "I" else "1"
+                                 for letter in pauli) or "0", 2))
+    return np.array(masks, dtype=np.uint64)
+
+
+def parity_signs(outcomes: Any, masks: Any) -> FloatArray:
+    """Eigenvalues +-1 of every observable masks on every outcome."""
+    masked = np.asarray(masks, dtype=np.uint64)[..., np.newaxis] \
+        & np.asarray(outcomes, dtype=np.uint64)
+    out: FloatArray = 1. - 2. * (popcount(masked)
+                                 & np.uint64(1)).astype(np.float64)
+    return out
+
+
+def parity_expvals(outcomes: Any, weights: Any, masks: Any) -> FloatArray:
+    """Return the expectation values of every observable of masks."""
+    weights = np.asarray(weights, dtype=float)
+    out: FloatArray = parity_signs(outcomes, masks) @ weights / weights.sum()
+    return out
+
+
+def result_arrays(result: Any,
+                  experiment: int = 0,
+                  memory: bool = False) -> tuple[UIntArray, UIntArray]:
+    """Outcomes and weights of an experiment, from its memory if memory."""
+    if memory:
+        return memory_arrays(result.get_memory(experiment))
+    return counts_arrays(result.get_counts(experiment))
+
+
+@timed("marginals/expval_matrix")
+def expval_matrix(results: Sequence[Any],
+                  masks: Any,
+                  memory: bool = False) -> FloatArray:
+    """
+    # Expectation values of many observables over many results.
+
+    Returns observables x results, the points of zne_extr when results
+    are the results of one circuit at every scale factor. Every result is
+    converted once, whatever the number of observables.
+    """
+    masks = np.atleast_1d(np.asarray(masks, dtype=np.uint64))
+    out: FloatArray = np.empty((len(masks), len(results)))
+    for column, result in enumerate(results):
+        out[:, column] = parity_expvals(*result_arrays(result, 0, memory),
+                                        masks)
+    return out
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module parallel.
+
+Scales large batches of schedules over a process pool.
+Every schedule is planned and every distinct pulse of the batch is solved
+once in the parent process. The workers get the plans and the scaled
+pulses, and only rebuild the schedules.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Iterable, Optional, Sequence
+import qiskit.pulse as ps
+import pulse_scaler.backends.load_ibmq as cons
+from pulse_scaler.pulse_cache import DEFAULT_CACHE, PulseCache
+from pulse_scaler.pulse_table import PulseKey
+from pulse_scaler.qubit_scaling import PlannedInstr, build_schedule, \
+    plan_keys, plan_schedule
+
+# State of a worker process, set by _init_worker.
+_WORKER_PULSES: dict[PulseKey, ps.ParametricPulse] = {}
+_WORKER_MEAS_SCHED: Optional[ps.Schedule] = None
+
+
+def scaled_pulses(plans: Iterable[list[list[PlannedInstr]]],
+                  cache: Optional[PulseCache] = None
+                  ) -> dict[PulseKey, ps.ParametricPulse]:
+    """Scaled pulse of every distinct key of plans, in one solve."""
+    keys: dict[PulseKey, None] = {}
+    for sched_plans in plans:
+        keys.update(dict.fromkeys(plan_keys(sched_plans)))
+    cache = DEFAULT_CACHE if cache is None else cache
+    return dict(zip(keys, cache.get_many(list(keys))))
+
+
+def _init_worker(pulses: dict[PulseKey, ps.ParametricPulse],
+                 meas_sched: ps.Schedule) -> None:
+    """Keep the scaled pulses and the measurement in a worker."""
+    # pylint: disable=global-statement
+    global _WORKER_PULSES, _WORKER_MEAS_SCHED
+    _WORKER_PULSES = pulses
+    _WORKER_MEAS_SCHED = meas_sched
+
+
+def _build_one(plans: list[list[PlannedInstr]]) -> list[ps.Schedule]:
+    """Build the scaled schedules of one schedule inside a worker."""
+    return [build_schedule(plan, _WORKER_PULSES, _WORKER_MEAS_SCHED)
+            for plan in plans]
+
+
+def qubit_scaler_batch(scheds: Sequence[ps.Schedule],
+                       scale_factors: Sequence[float],
+                       max_workers: Optional[int] = None,
+                       chunksize: int = 1,
+                       cache: Optional[PulseCache] = None
+                       ) -> list[list[ps.Schedule]]:
+    """
+    # Qubit Scaler over a process pool.
+
+    Returns, in the order of scheds, the scaled schedules of each schedule
+    for every factor of scale_factors.
+
+    params:
+        scheds: schedules to scale.
+        scale_factors: scale factors applied to every schedule.
+        max_workers: number of processes, os.cpu_count() if None, 1
+            scales in this process.
+        chunksize: number of schedules sent to a worker at once.
+        cache: cache the pulses are solved with, DEFAULT_CACHE if None.
+    """
+    plans = [plan_schedule(sched, scale_factors) for sched in scheds]
+    pulses = scaled_pulses(plans, cache)
+    # Resolved here, spawned workers don't see the backend selected with
+    # use_backend.
+    meas_sched = cons.MEAS_SCHED
+    if max_workers == 1 or len(scheds) <= 1:
+        return [[build_schedule(plan, pulses, meas_sched)
+                 for plan in sched_plans] for sched_plans in plans]
+    # Spawned workers, like pulse_scaler.simulation, so that the pool is
+    # safe whatever ran in the parent process before.
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             mp_context=get_context("spawn"),
+                             initializer=_init_worker,
+                             initargs=(pulses, meas_sched)) as pool:
+        return list(pool.map(_build_one, plans, chunksize=chunksize))
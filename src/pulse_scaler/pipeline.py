@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module pipeline.
+
+Streaming zero noise extrapolation, built from generator stages:
+transpile -> schedule -> scale -> submit/collect -> extrapolate.
+Every stage pulls from the previous one only when it needs a new item, so
+circuits are transpiled and scaled while the jobs of the previous ones
+run, and at most window jobs are in flight. Partial estimates are yielded
+as soon as the results of a circuit arrive.
+
+    for point in stream_zne(circuits, [1, 2, 3]):
+        print(point.circuit, point.estimate, point.complete)
+"""
+from collections import deque
+import time
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, \
+    Optional, Sequence
+import numpy as np
+import qiskit as qs
+import pulse_scaler.backends.load_ibmq as cons
+import pulse_scaler.extrapolation as ex
+from pulse_scaler.instrumentation import stage
+from pulse_scaler.marginals import ALL_BITS, parity_expvals, result_arrays
+from pulse_scaler.pulse_areas import FloatArray
+from pulse_scaler.pulse_cache import PulseCache
+from pulse_scaler.qubit_scaling import qubit_scaler_many
+
+# Expectation value of the experiment of index experiment in a result.
+ExpvalFunc = Callable[[Any, int], float]
+
+
+class ZnePoint(NamedTuple):
+    """Zero noise estimate of a circuit from the results arrived so far."""
+
+    circuit: int
+    estimate: float
+    scale_factors: tuple[float, ...]
+    values: tuple[float, ...]
+    complete: bool
+
+
+def parity_expval(result: Any, experiment: int = 0) -> float:
+    """Return the expectation value of Z on every measured bit."""
+    outcomes, weights = result_arrays(result, experiment)
+    return float(parity_expvals(outcomes, weights, ALL_BITS))
+
+
+def transpile_stage(circuits: Iterable[qs.QuantumCircuit],
+                    backend: Any,
+                    **options: Any) -> Iterator[tuple[int, Any]]:
+    """Transpile circuits one at a time for backend."""
+    for index, circuit in enumerate(circuits):
+        yield index, qs.compiler.transpile(circuit, backend, **options)
+
+
+def schedule_stage(items: Iterable[tuple[int, Any]],
+                   backend: Any) -> Iterator[tuple[int, Any]]:
+    """Schedule transpiled circuits one at a time for backend."""
+    for index, circuit in items:
+        yield index, qs.schedule(circuit, backend)
+
+
+def scale_stage(items: Iterable[tuple[int, Any]],
+                scale_factors: Sequence[float],
+                cache: Optional[PulseCache] = None
+                ) -> Iterator[tuple[int, int, Any]]:
+    """Yield (circuit, scale index, scaled schedule) for every factor."""
+    for index, sched in items:
+        for scale_index, scaled in enumerate(
+                qubit_scaler_many(sched, scale_factors, cache)):
+            yield index, scale_index, scaled
+
+
+def _submit(pending: Iterator[tuple[int, int, Any]],
+            in_flight: deque[tuple[int, int, Any]],
+            window: int,
+            backend: Any,
+            run_options: dict[str, Any]) -> bool:
+    """Submit until window jobs are in flight, False once pending is empty."""
+    while len(in_flight) < window:
+        item = next(pending, None)
+        if item is None:
+            return False
+        index, scale_index, sched = item
+        with stage("backend/submit"):
+            job = backend.run(sched, **run_options)
+        in_flight.append((index, scale_index, job))
+    return True
+
+
+def run_stage(items: Iterable[tuple[int, int, Any]],
+              backend: Any,
+              window: int = 4,
+              poll_interval: float = 0.05,
+              **run_options: Any) -> Iterator[tuple[int, int, Any]]:
+    """
+    # Submit and collect.
+
+    Keeps at most window jobs in flight and yields
+    (circuit, scale index, result) as the jobs finish, in any order.
+    """
+    if window < 1:
+        raise ValueError("Argument 'window' must be at least 1.")
+    pending = iter(items)
+    in_flight: deque[tuple[int, int, Any]] = deque()
+    more = True
+    while True:
+        if more:
+            more = _submit(pending, in_flight, window, backend, run_options)
+        if not in_flight:
+            break
+        done = [entry for entry in in_flight if entry[2].in_final_state()]
+        if not done:
+            time.sleep(poll_interval)
+            continue
+        for entry in done:
+            in_flight.remove(entry)
+            index, scale_index, job = entry
+            with stage("backend/result"):
+                result = job.result()
+            yield index, scale_index, result
+
+
+def extrapolate_stage(items: Iterable[tuple[int, int, Any]],
+                      scale_factors: Sequence[float],
+                      method: str = "linear",
+                      expval: ExpvalFunc = parity_expval
+                      ) -> Iterator[ZnePoint]:
+    """
+    # Partial and final estimates.
+
+    Yields a ZnePoint every time a result of a circuit arrives and enough
+    points are there for method, complete once every factor arrived.
+    Richardson uses every point arrived so far. A fit that fails, 'exp' on
+    values of both signs, gives a NaN estimate instead of ending the
+    stream.
+    """
+    arrived: dict[int, dict[int, float]] = {}
+    for index, scale_index, result in items:
+        values = arrived.setdefault(index, {})
+        values[scale_index] = expval(result, 0)
+        order = sorted(values)
+        scale = [float(scale_factors[i]) for i in order]
+        points = [values[i] for i in order]
+        complete = len(values) == len(scale_factors)
+        if len(points) <= ex.fit_order(method, len(points)):
+            continue
+        batch: FloatArray = np.array([points], dtype=float)
+        try:
+            estimate = float(np.asarray(ex.zne_extr(batch, scale,
+                                                    method))[0])
+        except ValueError:
+            estimate = float("nan")
+        yield ZnePoint(index, estimate, tuple(scale), tuple(points),
+                       complete)
+        if complete:
+            del arrived[index]
+
+
+def stream_zne(circuits: Iterable[qs.QuantumCircuit],
+               scale_factors: Sequence[float],
+               backend: Optional[Any] = None,
+               run_backend: Optional[Any] = None,
+               window: int = 4,
+               method: str = "linear",
+               expval: ExpvalFunc = parity_expval,
+               transpile_options: Optional[dict[str, Any]] = None,
+               **run_options: Any) -> Iterator[ZnePoint]:
+    """
+    # Streaming zero noise extrapolation.
+
+    params:
+        circuits: circuits to mitigate, consumed lazily.
+        scale_factors: scale factors, 1 runs the unscaled schedule.
+        backend: backend transpiled and scheduled for, cons.IBMQBACKEND
+            if None.
+        run_backend: backend the schedules run on, cons.BACKEND if None.
+        window: maximum number of jobs in flight.
+        method: extrapolation method of pulse_scaler.extrapolation.
+        expval: expectation value of a result.
+        transpile_options: options of qiskit.compiler.transpile.
+        run_options: options of run_backend.run, seeds and shots of
+            pulse_scaler.backends.load_ibmq by default.
+    """
+    # pylint: disable=too-many-arguments
+    backend = cons.IBMQBACKEND if backend is None else backend
+    run_backend = cons.BACKEND if run_backend is None else run_backend
+    run_options.setdefault("meas_return", "avg")
+    run_options.setdefault("seed_simulator", cons.SEED)
+    run_options.setdefault("shots", cons.SHOTS)
+    scheds = schedule_stage(
+        transpile_stage(circuits, backend, **(transpile_options or {})),
+        backend)
+    results = run_stage(scale_stage(scheds, scale_factors), run_backend,
+                        window=window, **run_options)
+    return extrapolate_stage(results, scale_factors, method, expval)
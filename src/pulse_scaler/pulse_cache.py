@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module pulse_cache.
+
+Memoizes scaled qiskit pulses.
+Calibrated schedules reuse the same few pulses (X, SX, CR) many times, so
+the scaled pulse is kept in a bounded LRU cache keyed on the parameters of
+the pulse and on the scale factor. The cache can be saved to disk so that
+later processes start warm, the file carries a format version and a
+fingerprint of the solver and is ignored when either changed. A new
+calibration needs no fingerprint, its pulses have other keys. Pulses
+without a closed form area are stretched by resampling with stretch_pulse.
+Given a pulse_scaler.amp_table.AmpTable, the misses are looked up in the
+table before being solved.
+"""
+from collections import OrderedDict
+import functools
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Optional, cast
+import numpy as np
+import qiskit.pulse as ps
+from qiskit.pulse.library import Pulse
+from pulse_scaler.instrumentation import count
+from pulse_scaler.envelopes import stretch_samples
+from pulse_scaler.pulse_areas import ComplexArray
+from pulse_scaler.pulse_table import PulseKey, PulseTable
+
+if TYPE_CHECKING:
+    from pulse_scaler.amp_table import AmpTable
+
+CACHE_VERSION = 1
+
+
+def pulse_key(pulse: ps.ParametricPulse,
+              scale_factor: float) -> PulseKey | None:
+    """Key of a pulse and scale factor, None if the shape isn't supported."""
+    scale_factor = float(scale_factor)
+    if isinstance(pulse, ps.Drag):
+        return ("Drag", pulse.duration, complex(pulse.amp),
+                float(pulse.sigma), float(pulse.beta), scale_factor)
+    if isinstance(pulse, ps.GaussianSquare):
+        return ("Gaussian_Square", pulse.duration, complex(pulse.amp),
+                float(pulse.sigma), float(pulse.width), scale_factor)
+    if isinstance(pulse, ps.Gaussian):
+        return ("Gaussian", pulse.duration, complex(pulse.amp),
+                float(pulse.sigma), None, scale_factor)
+    return None
+
+
+def scaled_duration(dur: int, scale_factor: float) -> int:
+    """Duration of a scaled pulse, rounded to the sample grid."""
+    return int(round(dur * scale_factor))
+
+
+def effective_scale(dur: int, scale_factor: float) -> float:
+    """Scale factor actually applied once the duration is rounded."""
+    return scaled_duration(dur, scale_factor) / dur
+
+
+def solve_keys(keys: list[PulseKey]) -> ComplexArray:
+    """Amplitudes of the scaled pulses described by keys, in one solve."""
+    scale = np.array([effective_scale(key[1], key[5]) for key in keys])
+    return PulseTable.from_keys(keys).solve(scale)
+
+
+def solve_key(key: PulseKey) -> complex:
+    """Amplitude of the scaled pulse described by key."""
+    return complex(solve_keys([key])[0])
+
+
+# Pulses solved to fingerprint the solver, one per supported shape.
+PROBE_KEYS: list[PulseKey] = [
+    ("Gaussian", 160, 0.2 + 0.1j, 40., None, 2.5),
+    ("Drag", 160, 0.2 + 0.1j, 40., 1.5, 2.5),
+    ("Gaussian_Square", 800, 0.1 + 0.05j, 64., 544., 2.5)
+]
+
+
+@functools.lru_cache(maxsize=None)
+def solver_fingerprint() -> str:
+    """Hash of the amplitudes solved for PROBE_KEYS."""
+    amps = [solve_key(key) for key in PROBE_KEYS]
+    content = json.dumps([[f"{amp.real:.10e}", f"{amp.imag:.10e}"]
+                          for amp in amps])
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def build_pulse(key: PulseKey, amp: complex) -> ps.ParametricPulse:
+    """Build the scaled pulse described by key with amplitude amp."""
+    shape, dur, _, sig, extra, scale_factor = key
+    new_dur = scaled_duration(dur, scale_factor)
+    scale_factor = new_dur / dur
+    if shape == "Drag":
+        assert extra is not None
+        return ps.Drag(new_dur, amp, sig * scale_factor, extra * scale_factor)
+    if shape == "Gaussian_Square":
+        assert extra is not None
+        return ps.GaussianSquare(new_dur, amp, sig * scale_factor,
+                                 extra * scale_factor)
+    return ps.Gaussian(new_dur, amp, sig * scale_factor)
+
+
+def stretch_pulse(pulse: Pulse, dur: int) -> Pulse:
+    """
+    # Pulse of any shape stretched to duration dur, keeping its area.
+
+    Constant pulses only get their amplitude divided by the stretch, every
+    other pulse is sampled and resampled with stretch_samples.
+    """
+    if dur == pulse.duration:
+        return pulse
+    if isinstance(pulse, ps.Constant):
+        return ps.Constant(dur, complex(pulse.amp) * pulse.duration / dur)
+    if isinstance(pulse, ps.Waveform):
+        samples = pulse.samples
+    else:
+        samples = pulse.get_waveform().samples
+    return ps.Waveform(stretch_samples(samples, dur), name=pulse.name)
+
+
+def scale_pulse(pulse: ps.ParametricPulse,
+                scale_factor: float) -> ps.ParametricPulse | None:
+    """Scale a pulse keeping its area, None if the shape isn't supported."""
+    key = pulse_key(pulse, scale_factor)
+    if key is None:
+        return None
+    return build_pulse(key, solve_key(key))
+
+
+class PulseCache:
+    """
+    # LRU cache of scaled pulses.
+
+    Keeps at most maxsize scaled pulses, keyed with pulse_key.
+    If path is given, the cache is loaded from it on creation if it exists,
+    and save() writes it back. If table is given, misses are read from it
+    when possible.
+    """
+
+    def __init__(self,
+                 maxsize: int = 1024,
+                 path: Optional[str] = None,
+                 table: Optional["AmpTable"] = None) -> None:
+        """
+        Instantiate PulseCache.
+
+        Args:
+        - maxsize: maximum number of scaled pulses kept.
+        - path: json file used to persist the cache.
+        - table: precomputed amplitudes of the calibrated pulses.
+        """
+        if maxsize < 1:
+            raise ValueError("Argument 'maxsize' must be at least 1.")
+        self.maxsize = maxsize
+        self.path = path
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self._pulses: OrderedDict[PulseKey, ps.ParametricPulse] = \
+            OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        """Return the number of scaled pulses in the cache."""
+        return len(self._pulses)
+
+    def __contains__(self, key: PulseKey) -> bool:
+        """Whether key has a scaled pulse in the cache."""
+        return key in self._pulses
+
+    def lookup(self, key: PulseKey) -> ps.ParametricPulse | None:
+        """Scaled pulse of key, None on a miss."""
+        pulse = self._pulses.get(key)
+        if pulse is None:
+            self.misses += 1
+            count("cache_misses")
+            return None
+        self.hits += 1
+        count("cache_hits")
+        self._pulses.move_to_end(key)
+        return pulse
+
+    def insert(self, key: PulseKey, amp: complex) -> ps.ParametricPulse:
+        """Build the scaled pulse of key with amplitude amp and keep it."""
+        pulse = build_pulse(key, amp)
+        self._pulses[key] = pulse
+        self._pulses.move_to_end(key)
+        while len(self._pulses) > self.maxsize:
+            self._pulses.popitem(last=False)
+        return pulse
+
+    def _from_table(self, key: PulseKey) -> ps.ParametricPulse | None:
+        """Insert the scaled pulse of key from the table, None if absent."""
+        if self.table is None:
+            return None
+        amp = self.table.lookup(key)
+        if amp is None:
+            return None
+        count("table_hits")
+        return self.insert(key, amp)
+
+    def get(self,
+            pulse: ps.ParametricPulse,
+            scale_factor: float) -> ps.ParametricPulse | None:
+        """Scaled pulse, None if the shape isn't supported."""
+        key = pulse_key(pulse, scale_factor)
+        if key is None:
+            return None
+        scaled = self.lookup(key)
+        if scaled is None:
+            scaled = self._from_table(key)
+        if scaled is None:
+            scaled = self.insert(key, solve_key(key))
+        return scaled
+
+    def get_many(self,
+                 keys: list[PulseKey]) -> list[ps.ParametricPulse]:
+        """Scaled pulses of keys, all the misses are solved in one call."""
+        pulses = [self.lookup(key) for key in keys]
+        pulses = [self._from_table(key) if pulse is None else pulse
+                  for key, pulse in zip(keys, pulses)]
+        missing = [i for i, pulse in enumerate(pulses) if pulse is None]
+        if missing:
+            amps = solve_keys([keys[i] for i in missing])
+            for i, amp in zip(missing, amps):
+                pulses[i] = self.insert(keys[i], complex(amp))
+        return cast(list[ps.ParametricPulse], pulses)
+
+    def stats(self) -> dict[str, int]:
+        """Hits, misses and size of the cache."""
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._pulses),
+                "maxsize": self.maxsize}
+
+    def clear(self) -> None:
+        """Empty the cache and reset the statistics."""
+        self._pulses.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the cached keys and amplitudes to a json file."""
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the cache to.")
+        entries = []
+        for key, pulse in self._pulses.items():
+            shape, dur, amp, sig, extra, scale_factor = key
+            new_amp = complex(pulse.amp)
+            entries.append({
+                "shape": shape, "duration": dur,
+                "amp": [amp.real, amp.imag], "sigma": sig, "extra": extra,
+                "scale_factor": scale_factor,
+                "scaled_amp": [new_amp.real, new_amp.imag]
+            })
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"version": CACHE_VERSION,
+                       "fingerprint": solver_fingerprint(),
+                       "entries": entries}, file)
+
+    def load(self, path: str) -> bool:
+        """
+        # Add the entries of a json file written by save.
+
+        Files of another version or solver are ignored, returns whether the
+        entries were added.
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            content = json.load(file)
+        if not isinstance(content, dict) \
+                or content.get("version") != CACHE_VERSION \
+                or content.get("fingerprint") != solver_fingerprint():
+            return False
+        for entry in content["entries"]:
+            key: PulseKey = (entry["shape"], entry["duration"],
+                             complex(*entry["amp"]), entry["sigma"],
+                             entry["extra"], entry["scale_factor"])
+            self.insert(key, complex(*entry["scaled_amp"]))
+        return True
+
+
+DEFAULT_CACHE = PulseCache()
@@ -8,8 +8,13 @@ It also contains methods to keep pulse's under the cruve area constant.
 """
 from typing import Callable, Optional, Any, cast
 import numpy as np
+import numpy.typing as npt
 from scipy.integrate import quad
 from scipy.optimize import fsolve
+from pulse_scaler.pulse_areas import (normalized_areas, FloatArray,
+                                      ComplexArray)
+from pulse_scaler.envelopes import sampled_norm_areas
+from pulse_scaler.instrumentation import count, timed
 
 
 class PulseIntegrator:
@@ -33,6 +38,10 @@ class PulseIntegrator:
         """
         Instantiate PulseIntegrator.
 
+        No area is computed here: the area of the shape of the pulse is
+        integrated on first access of area and kept until a parameter
+        changes.
+
         Args:
         - amp: amplitude of the pulse.
         - dur: time duration of the pulse.
@@ -40,19 +49,12 @@ class PulseIntegrator:
         - width: width of gaussian square pulse.
         - beta: beta of drag pulse.
         """
-        self.amp = amp
-        self.dur = dur
-        self.sig = sig
-        self.width = None
-        self.beta = None
-        self.area = self.gaussian_int()
-        for key, item in kwargs.items():
-            if "width" == key:
-                self.width = item
-                self.area = self.square_gauss_int()
-            if "beta" == key:
-                self.beta = item
-                self.area = self.drag_int()
+        self._areas: dict[str, tuple[complex, float, float]] = {}
+        self._amp = amp
+        self._dur = dur
+        self._sig = sig
+        self._width = kwargs.get("width")
+        self._beta = kwargs.get("beta")
 
     def __str__(self) -> str:
         """Print all the instance attributes."""
@@ -65,6 +67,19 @@ class PulseIntegrator:
         beta: {self.beta}
         """
 
+    @property
+    def shape(self) -> str:
+        """Shape integrated by area: beta, then width, decide it."""
+        if self.beta is not None:
+            return "Drag"
+        if self.width is not None:
+            return "Gaussian_Square"
+        return "Gaussian"
+
+    def _invalidate(self) -> None:
+        """Forget the areas, a parameter changed."""
+        self._areas.clear()
+
     @property
     def width(self) -> float | None:
         """Width for square gaussian pulse."""
@@ -73,15 +88,22 @@ class PulseIntegrator:
     @width.setter
     def width(self, val: float | None) -> None:
         self._width = val
+        self._invalidate()
 
     @property
     def area(self) -> tuple[complex, float, float]:
-        """Area of pulse."""
-        return self._area
+        """Area of pulse, integrated on first access."""
+        shape = self.shape
+        if shape not in self._areas:
+            integrals = {"Drag": self.drag_int,
+                         "Gaussian_Square": self.square_gauss_int,
+                         "Gaussian": self.gaussian_int}
+            self._areas[shape] = integrals[shape]()
+        return self._areas[shape]
 
     @area.setter
     def area(self, val: tuple[complex, float, float]) -> None:
-        self._area = val
+        self._areas[self.shape] = val
 
     @property
     def amp(self) -> complex:
@@ -91,6 +113,7 @@ class PulseIntegrator:
     @amp.setter
     def amp(self, val: complex) -> None:
         self._amp = val
+        self._invalidate()
 
     @property
     def sig(self) -> float:
@@ -100,6 +123,7 @@ class PulseIntegrator:
     @sig.setter
     def sig(self, val: float) -> None:
         self._sig = val
+        self._invalidate()
 
     @property
     def beta(self) -> float | None:
@@ -109,6 +133,7 @@ class PulseIntegrator:
     @beta.setter
     def beta(self, val: float | None) -> None:
         self._beta = val
+        self._invalidate()
 
     @property
     def dur(self) -> float:
@@ -118,6 +143,7 @@ class PulseIntegrator:
     @dur.setter
     def dur(self, val: float) -> None:
         self._dur = val
+        self._invalidate()
 
     def gaussian_int(self) -> tuple[complex, float, float]:
         """
@@ -162,7 +188,7 @@ class PulseIntegrator:
             elif rise_fall <= x_val < rise_fall + cast(float, width):
                 output = 1
             elif rise_fall + cast(float, width) <= x_val:
-                num = x_val - rise_fall + cast(float, width)
+                num = x_val - rise_fall - cast(float, width)
                 output = np.exp(-.5 * s_q(num) / s_q(sig))
             return float(output)
         fm1 = f_prime(-1)
@@ -202,13 +228,54 @@ class PulseIntegrator:
         return complex_quadrature(integral, 0, dur)
 
 
+def check_areas(areas: npt.ArrayLike,
+                shapes: np.ndarray | list[str] | str,
+                amp: npt.ArrayLike,
+                dur: npt.ArrayLike,
+                sig: npt.ArrayLike,
+                width: Optional[npt.ArrayLike] = None,
+                beta: Optional[npt.ArrayLike] = None,
+                rtol: float = 1e-6) -> None:
+    """Raise a ValueError if analytic areas differ from the quadratures."""
+    # pylint: disable=too-many-arguments
+    areas = np.asarray(areas)
+    shape = areas.shape
+    shapes = np.broadcast_to(np.asarray(shapes), shape).ravel()
+    if width is None:
+        if np.any(shapes == "Gaussian_Square"):
+            errmess = "Argument 'width' is required for 'Gaussian_Square'"
+            raise ValueError(errmess)
+        width = 0.
+    amp = np.broadcast_to(np.asarray(amp, dtype=complex), shape).ravel()
+    dur = np.broadcast_to(np.asarray(dur, dtype=float), shape).ravel()
+    sig = np.broadcast_to(np.asarray(sig, dtype=float), shape).ravel()
+    width = np.broadcast_to(np.asarray(width, dtype=float), shape).ravel()
+    beta = np.broadcast_to(np.asarray(0. if beta is None else beta,
+                                      dtype=float), shape).ravel()
+    for i, area in enumerate(areas.ravel()):
+        integrator = PulseIntegrator(amp[i], dur[i], sig[i])
+        if shapes[i] == "Gaussian_Square":
+            integrator.width = float(width[i])
+            reference = integrator.square_gauss_int()[0]
+        elif shapes[i] == "Drag":
+            integrator.beta = float(beta[i])
+            reference = integrator.drag_int()[0]
+        else:
+            reference = integrator.gaussian_int()[0]
+        if not np.isclose(area, reference, rtol=rtol, atol=0):
+            errmess = (f"Analytic area {area} of pulse {i} ({shapes[i]}) "
+                       f"differs from quadrature {reference}")
+            raise ValueError(errmess)
+
+
 def _func_to_find_zero(integrator: PulseIntegrator,
                        func: Callable[[], tuple[complex, float, float]],
-                       amp: complex) -> complex:
-    """Return a value shifted to be zero when the area is constant."""
-    PulseIntegrator.amp.fset(integrator, amp)  # type: ignore
+                       amp: complex,
+                       target: complex) -> complex:
+    """Return a value shifted to be zero when the area is target."""
+    integrator.amp = amp
     new_area = func()
-    return new_area[0] - integrator.area[0]
+    return new_area[0] - target
 
 
 def func_as_real(func: Callable[[complex], complex]
@@ -220,6 +287,7 @@ def func_as_real(func: Callable[[complex], complex]
     return inner
 
 
+@timed("quadrature")
 def complex_quadrature(func: Callable[[float], complex],
                        lower_bound: float,
                        upper_bound: float,
@@ -242,6 +310,7 @@ def complex_quadrature(func: Callable[[float], complex],
 
     def imag_func(tmp: float) -> float:
         return float(np.imag(func(tmp)))
+    count("quadratures", 2)
     real_integral = quad(real_func, lower_bound, upper_bound, **kwargs)
     imag_integral = quad(imag_func, lower_bound, upper_bound, **kwargs)
     return (real_integral[0] + 1j*imag_integral[0],
@@ -253,19 +322,82 @@ def s_q(any_float: float) -> float:
     return any_float * any_float
 
 
+@timed("solve_pulse_amps")
+def solve_pulse_amps(shapes: np.ndarray | list[str] | str,
+                     dur: FloatArray,
+                     amp: ComplexArray,
+                     sig: FloatArray,
+                     scale: FloatArray,
+                     width: Optional[FloatArray] = None,
+                     sampled: bool = False) -> ComplexArray:
+    """
+    # Amplitudes of a batch of scaled pulses.
+
+    The area of every supported envelope is linear in amp, so the amplitude
+    keeping the area constant is the ratio of the normalized areas of the
+    pulse and of the pulse stretched by scale. All arguments broadcast
+    together, so many (pulse, scale) pairs are solved in one call.
+
+    params:
+        shapes: name of each pulse shape, 'Gaussian', 'Gaussian_Square'
+            or 'Drag'.
+        dur, amp, sig: parameters of the pulses.
+        scale: scale factors.
+        width: widths of the pulses, only read for 'Gaussian_Square'.
+        sampled: use the sums of the samples on the dt grid instead of
+            the continuous areas, the durations must then be integers.
+    """
+    # pylint: disable=too-many-arguments
+    areas = sampled_norm_areas if sampled else normalized_areas
+    dur = np.asarray(dur, dtype=float)
+    sig = np.asarray(sig, dtype=float)
+    scale = np.asarray(scale, dtype=float)
+    area = areas(shapes, dur, sig, width)
+    scaled_width = None if width is None else np.asarray(width) * scale
+    scaled_area = areas(shapes, dur * scale, sig * scale, scaled_width)
+    out: ComplexArray = np.asarray(amp, dtype=complex) * area / scaled_area
+    count("analytic_solves", out.size)
+    return out
+
+
+def _fsolve_amp(func: Callable[[list[float]], list[float]],
+                amp: complex) -> complex:
+    """Find the zero of func from amp, counting the evaluations of func."""
+    solution, info, _, _ = fsolve(func, [amp.real, amp.imag],
+                                  full_output=True)
+    count("solver_iterations", int(info["nfev"]))
+    return complex(*solution)
+
+
+@timed("find_pulse_amp")
 def find_pulse_amp(pulse: str,
                    dur: float,
                    amp: complex,
                    sig: float,
                    scale: float,
                    beta: Optional[float] = None,
-                   width: Optional[float] = None) -> complex | None:
-    """Find the pulse amplitude of a scaled pulse."""
+                   width: Optional[float] = None,
+                   method: str = "analytic") -> complex | None:
+    """
+    Find the pulse amplitude of a scaled pulse.
+
+    The default method is the closed form of solve_pulse_amps.
+    method='fsolve' finds the amplitude numerically with the quadratures of
+    PulseIntegrator, for envelopes whose area is not linear in amp.
+    """
     # pylint: disable=too-many-arguments
     # Will fix later
+    if method == "analytic":
+        if pulse not in ("Drag", "Gaussian_Square", "Gaussian"):
+            return None
+        return complex(solve_pulse_amps(pulse, dur, amp, sig, scale,
+                                        width=width))
+    if method != "fsolve":
+        raise ValueError(f"Unknown method '{method}' for 'find_pulse_amp'")
     if pulse == "Drag":
         beta = cast(float, beta)
         integrator = PulseIntegrator(amp, dur, sig, beta=beta)
+        target = integrator.area[0]
         integrator.dur = dur * scale
         integrator.sig = sig * scale
         integrator.beta = beta * scale
@@ -274,11 +406,12 @@ def find_pulse_amp(pulse: str,
         def optimize(amplitude: complex) -> complex:
             return _func_to_find_zero(integrator,
                                       integrator.drag_int,
-                                      amplitude)
-        return complex(*fsolve(optimize, [amp.real, amp.imag]))
+                                      amplitude, target)
+        return _fsolve_amp(optimize, amp)
     if pulse == "Gaussian_Square":
         width = cast(float, width)
         integrator = PulseIntegrator(amp, dur, sig, width=width)
+        target = integrator.area[0]
         integrator.width = cast(float, integrator.width)
         integrator.dur *= scale
         integrator.sig *= scale
@@ -288,10 +421,11 @@ def find_pulse_amp(pulse: str,
         def optimize2(amplitude: complex) -> complex:
             return _func_to_find_zero(integrator,
                                       integrator.square_gauss_int,
-                                      amplitude)
-        return complex(*fsolve(optimize2, [amp.real, amp.imag]))
+                                      amplitude, target)
+        return _fsolve_amp(optimize2, amp)
     if pulse == "Gaussian":
         integrator = PulseIntegrator(amp, dur, sig)
+        target = integrator.area[0]
         integrator.dur *= scale
         integrator.sig *= scale
 
@@ -299,6 +433,6 @@ def find_pulse_amp(pulse: str,
         def optimize3(amplitude: complex) -> complex:
             return _func_to_find_zero(integrator,
                                       integrator.gaussian_int,
-                                      amplitude)
-        return complex(*fsolve(optimize3, [amp.real, amp.imag]))
+                                      amplitude, target)
+        return _fsolve_amp(optimize3, amp)
     return None
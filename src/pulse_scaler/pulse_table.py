@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module pulse_table.
+
+Columnar representation of many pulses: one structured NumPy array with a
+row per pulse, instead of one Python object per pulse. The areas and the
+scaled amplitudes of a whole table are computed with single vectorized
+calls, and PulseView gives a slim per-pulse access where one is needed.
+
+    table = PulseTable.from_schedule(sched)
+    amps = table.solve(3.)
+"""
+from typing import Any, Iterable, Iterator, Optional
+import numpy as np
+import qiskit.pulse as ps
+from pulse_scaler.pulse_areas import ComplexArray, FloatArray, SHAPES, \
+    pulse_areas
+from pulse_scaler.pulse_integrator import solve_pulse_amps
+
+# (shape, duration, amp, sigma, beta or width, scale_factor)
+PulseKey = tuple[str, int, complex, float, Optional[float], float]
+
+# Shape codes are indices in SHAPES, beta and width are nan when unused.
+# time and instruction locate the pulse in its schedule, -1 if it has none.
+PULSE_DTYPE = np.dtype([
+    ("shape", np.int8),
+    ("duration", np.int64),
+    ("amp", np.complex128),
+    ("sigma", np.float64),
+    ("beta", np.float64),
+    ("width", np.float64),
+    ("time", np.int64),
+    ("instruction", np.int64),
+])
+GAUSSIAN, GAUSSIAN_SQUARE, DRAG = (SHAPES.index(name) for name in
+                                   ("Gaussian", "Gaussian_Square", "Drag"))
+
+# Row of PULSE_DTYPE.
+PulseRow = tuple[int, int, complex, float, float, float, int, int]
+
+
+def pulse_row(pulse: Any, time: int = -1, instruction: int = -1
+              ) -> Optional[PulseRow]:
+    """Row of a qiskit pulse, None if the shape isn't supported."""
+    if isinstance(pulse, ps.Drag):
+        return (DRAG, pulse.duration, complex(pulse.amp), float(pulse.sigma),
+                float(pulse.beta), np.nan, time, instruction)
+    if isinstance(pulse, ps.GaussianSquare):
+        return (GAUSSIAN_SQUARE, pulse.duration, complex(pulse.amp),
+                float(pulse.sigma), np.nan, float(pulse.width), time,
+                instruction)
+    if isinstance(pulse, ps.Gaussian):
+        return (GAUSSIAN, pulse.duration, complex(pulse.amp),
+                float(pulse.sigma), np.nan, np.nan, time, instruction)
+    return None
+
+
+class PulseView:
+    """Read-only view of one row of a PulseTable."""
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: "PulseTable", row: int) -> None:
+        """View the row of index row of table."""
+        self.table = table
+        self.row = row
+
+    def __repr__(self) -> str:
+        """Represent the pulse by its parameters."""
+        return (f"PulseView({self.shape}, duration={self.duration}, "
+                f"amp={self.amp}, sigma={self.sigma}, beta={self.beta}, "
+                f"width={self.width})")
+
+    @property
+    def shape(self) -> str:
+        """Name of the shape of the pulse."""
+        return SHAPES[int(self.table.data["shape"][self.row])]
+
+    @property
+    def duration(self) -> int:
+        """Duration of the pulse."""
+        return int(self.table.data["duration"][self.row])
+
+    @property
+    def amp(self) -> complex:
+        """Amplitude of the pulse."""
+        return complex(self.table.data["amp"][self.row])
+
+    @property
+    def sigma(self) -> float:
+        """Standard deviation of the pulse."""
+        return float(self.table.data["sigma"][self.row])
+
+    @property
+    def beta(self) -> Optional[float]:
+        """Beta of a drag pulse, None otherwise."""
+        beta = float(self.table.data["beta"][self.row])
+        return None if np.isnan(beta) else beta
+
+    @property
+    def width(self) -> Optional[float]:
+        """Width of a square gaussian pulse, None otherwise."""
+        width = float(self.table.data["width"][self.row])
+        return None if np.isnan(width) else width
+
+    @property
+    def area(self) -> complex:
+        """Area under the pulse."""
+        return complex(self.table[self.row:self.row + 1].areas()[0])
+
+    def key(self, scale_factor: float) -> PulseKey:
+        """Key of the pulse scaled by scale_factor."""
+        return (self.shape, self.duration, self.amp, self.sigma,
+                self.beta if self.width is None else self.width,
+                float(scale_factor))
+
+
+class PulseTable:
+    """
+    # Table of pulses.
+
+    Wraps a structured array of PULSE_DTYPE. Built from rows, pulses,
+    schedules or keys, indexed to a PulseView or, with a slice or mask, to
+    a sub-table sharing the same memory.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: np.ndarray) -> None:
+        """Instantiate around data, an array of PULSE_DTYPE."""
+        if data.dtype != PULSE_DTYPE:
+            raise ValueError("Argument 'data' must be of dtype PULSE_DTYPE.")
+        self.data = data
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[PulseRow]) -> "PulseTable":
+        """Table of rows, allocated once."""
+        return cls(np.array(list(rows), dtype=PULSE_DTYPE))
+
+    @classmethod
+    def from_pulses(cls, pulses: Iterable[Any]) -> "PulseTable":
+        """Table of the supported pulses of pulses."""
+        rows = (pulse_row(pulse) for pulse in pulses)
+        return cls.from_rows(row for row in rows if row is not None)
+
+    @classmethod
+    def from_schedule(cls, sched: ps.Schedule) -> "PulseTable":
+        """Table of the supported pulses played in sched, in one pass."""
+        return cls.from_instructions(sched.instructions)
+
+    @classmethod
+    def from_instructions(cls,
+                          instructions: Iterable[tuple[int, Any]]
+                          ) -> "PulseTable":
+        """Table of the supported pulses of (time, instruction) pairs."""
+        rows = (pulse_row(instr.pulse, time, index)
+                for index, (time, instr) in enumerate(instructions)
+                if isinstance(instr, ps.Play))
+        return cls.from_rows(row for row in rows if row is not None)
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[PulseKey]) -> "PulseTable":
+        """Table of the unscaled pulses of keys."""
+        rows = []
+        for shape, dur, amp, sig, extra, _ in keys:
+            code = SHAPES.index(shape)
+            extra = np.nan if extra is None else extra
+            rows.append((code, dur, amp, sig,
+                         extra if code == DRAG else np.nan,
+                         extra if code == GAUSSIAN_SQUARE else np.nan,
+                         -1, -1))
+        return cls.from_rows(rows)
+
+    def __len__(self) -> int:
+        """Return the number of pulses."""
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[PulseView]:
+        """Iterate over views of the pulses."""
+        return (PulseView(self, row) for row in range(len(self.data)))
+
+    def __getitem__(self, index: Any) -> Any:
+        """View of a pulse for an int, sub-table otherwise."""
+        if isinstance(index, (int, np.integer)):
+            return PulseView(self, int(index) % len(self.data))
+        return PulseTable(self.data[index])
+
+    @property
+    def shapes(self) -> np.ndarray:
+        """Names of the shapes of the pulses."""
+        out: np.ndarray = np.array(SHAPES)[self.data["shape"]]
+        return out
+
+    @property
+    def extra(self) -> FloatArray:
+        """Beta of the drag pulses and width of the square pulses."""
+        out: FloatArray = np.where(self.data["shape"] == DRAG,
+                                   self.data["beta"], self.data["width"])
+        return out
+
+    def areas(self) -> ComplexArray:
+        """Areas under every pulse, in one vectorized call."""
+        return pulse_areas(self.shapes, self.data["amp"],
+                           self.data["duration"], self.data["sigma"],
+                           width=np.nan_to_num(self.data["width"]))
+
+    def solve(self, scale: Any) -> ComplexArray:
+        """Amplitudes of every pulse stretched by scale, in one call."""
+        return solve_pulse_amps(self.shapes, self.data["duration"],
+                                self.data["amp"], self.data["sigma"],
+                                np.asarray(scale, dtype=float),
+                                width=np.nan_to_num(self.data["width"]))
+
+    def keys(self, scale: Any) -> list[PulseKey]:
+        """Keys of every pulse stretched by scale, broadcast to the rows."""
+        scale = np.broadcast_to(np.asarray(scale, dtype=float),
+                                (len(self.data),))
+        extra = self.extra
+        return [(str(name), int(dur), complex(amp), float(sig),
+                 None if np.isnan(ext) else float(ext), float(fac))
+                for name, dur, amp, sig, ext, fac in zip(
+                    self.shapes, self.data["duration"], self.data["amp"],
+                    self.data["sigma"], extra, scale)]
@@ -6,54 +6,162 @@
 ## Implements qubit scaling using qiskit pulse.
 ### Autor: Dimitri Bonanni-Surprenant
 """
+from typing import Optional, Sequence
+import numpy as np
 import qiskit.pulse as ps
-from pulse_scaler.pulse_integrator import find_pulse_amp
-from pulse_scaler.backends.load_ibmq import MEAS_SCHED
+from qiskit.pulse.library import Pulse
+from pulse_scaler.pulse_cache import PulseCache, DEFAULT_CACHE, \
+    stretch_pulse
+from pulse_scaler.pulse_table import PulseKey, PulseTable
+import pulse_scaler.backends.load_ibmq as cons
+from pulse_scaler.instrumentation import count, stage, timed
 
 
-def qubit_scaler(sched: ps.Schedule, scale_factor: float) -> ps.Schedule:
+def qubit_scaler(sched: ps.Schedule,
+                 scale_factor: float,
+                 cache: Optional[PulseCache] = None) -> ps.Schedule:
     """
     # Qubit Scaler.
 
-    Scales a schedule on one qubit
-    """
-    # pylint: disable=too-many-locals.
-    # Will fix later.
-
-    offset = 0
-    out_sched = ps.Schedule()
-    for _, sub_sched in sched.children:
-        tmp_sched = ps.Schedule()
-        for _, instr in sub_sched.children:
-            if isinstance(instr, ps.instructions.Play):
-                pulse, chan = instr.pulse, instr.channel
-                if isinstance(pulse, ps.Drag):
-                    dur, amp, sig, beta = (pulse.duration, pulse.amp,
-                                           pulse.sigma, pulse.beta)
-                    amp = find_pulse_amp(
-                        "Drag", dur, amp, sig, scale_factor, beta=beta
-                    )
-                    new_pulse = ps.Drag(
-                        dur * scale_factor,
-                        amp, sig * scale_factor,
-                        beta * scale_factor
-                    )
-                elif isinstance(pulse, ps.GaussianSquare):
-                    dur, amp, sig, width = (pulse.duration, pulse.amp,
-                                            pulse.sigma, float(pulse.width))
-                    amp = find_pulse_amp(
-                        "Gaussian_Square",
-                        dur, amp, sig, scale_factor, width=width
-                    )
-                    new_pulse = ps.GaussianSquare(
-                        dur * scale_factor,
-                        amp, sig * scale_factor,
-                        width * scale_factor
-                    )
-                offset += dur * scale_factor
-                instr = ps.Play(new_pulse, chan)
-            tmp_sched += instr
-        out_sched += tmp_sched
-    out_sched += MEAS_SCHED << out_sched.stop_time
-
-    return out_sched
+    Scales a schedule on one qubit.
+    Scaled pulses are memoized in cache, DEFAULT_CACHE if not given.
+    """
+    return qubit_scaler_many(sched, [scale_factor], cache)[0]
+
+
+# (start time, instruction, duration, key of the scaled pulse) of a
+# scaled instruction.
+PlannedInstr = tuple[int, ps.Instruction, int, Optional[PulseKey]]
+
+
+def scaled_span(time: int, duration: int, scale_factor: float
+                ) -> tuple[int, int]:
+    """
+    Start time and duration of a scaled instruction.
+
+    Both ends are scaled then rounded to the sample grid, so instructions
+    that were contiguous or aligned across channels still are.
+    """
+    start_time = int(round(time * scale_factor))
+    stop_time = int(round((time + duration) * scale_factor))
+    return start_time, stop_time - start_time
+
+
+def plan_schedule(sched: ps.Schedule,
+                  scale_factors: Sequence[float]
+                  ) -> list[list[PlannedInstr]]:
+    """
+    # Plan of the scaled schedules.
+
+    Walks the whole instruction tree of sched once, filling a PulseTable
+    of its supported pulses, and returns, for every scale factor, the
+    scaled start time and duration of every instruction with the key of its
+    scaled pulse if it plays a supported pulse.
+    Acquire and instant instructions keep their duration.
+    """
+    instructions = sched.instructions
+    table = PulseTable.from_instructions(instructions)
+    pulse_rows = dict(zip(table.data["instruction"].tolist(),
+                          range(len(table))))
+    return [_plan_scaled(instructions, pulse_rows,
+                         _scaled_keys(table, scale_factor), scale_factor)
+            for scale_factor in scale_factors]
+
+
+def _scaled_keys(table: PulseTable, scale_factor: float) -> list[PulseKey]:
+    """Keys of the pulses of table once scaled, rounded like scaled_span."""
+    times = table.data["time"]
+    durations = table.data["duration"]
+    new_durations = (np.rint((times + durations) * scale_factor)
+                     - np.rint(times * scale_factor))
+    return table.keys(new_durations / durations)
+
+
+def _plan_scaled(instructions: Sequence[tuple[int, ps.Instruction]],
+                 pulse_rows: dict[int, int],
+                 keys: list[PulseKey],
+                 scale_factor: float) -> list[PlannedInstr]:
+    """Plan of instructions for one scale factor, see plan_schedule."""
+    plan: list[PlannedInstr] = []
+    for index, (time, instr) in enumerate(instructions):
+        if instr.duration == 0 or isinstance(instr, ps.Acquire):
+            plan.append((int(round(time * scale_factor)), instr,
+                         instr.duration, None))
+            continue
+        start_time, duration = scaled_span(time, instr.duration,
+                                           scale_factor)
+        row = pulse_rows.get(index)
+        plan.append((start_time, instr, duration,
+                     None if row is None else keys[row]))
+    return plan
+
+
+def plan_keys(plans: list[list[PlannedInstr]]) -> list[PulseKey]:
+    """Distinct keys of the scaled pulses of plans."""
+    keys: dict[PulseKey, None] = {}
+    for plan in plans:
+        for *_, key in plan:
+            if key is not None:
+                keys[key] = None
+    return list(keys)
+
+
+def build_schedule(plan: list[PlannedInstr],
+                   scaled: dict[PulseKey, ps.ParametricPulse],
+                   meas_sched: Optional[ps.Schedule] = None
+                   ) -> ps.Schedule:
+    """
+    Build a scaled schedule from its plan, measurement appended.
+
+    Pulses without a key are stretched with stretch_pulse, once per
+    distinct pulse and duration. The measurement is meas_sched,
+    cons.MEAS_SCHED if None.
+    """
+    pairs: list[tuple[int, ps.Instruction | ps.Schedule]] = []
+    stretched: dict[tuple[int, int], Pulse] = {}
+    stop_time = 0
+    for start_time, instr, duration, key in plan:
+        if key is not None:
+            instr = ps.Play(scaled[key], instr.channel, name=instr.name)
+        elif isinstance(instr, ps.Play):
+            memo = (id(instr.pulse), duration)
+            if memo not in stretched:
+                stretched[memo] = stretch_pulse(instr.pulse, duration)
+            instr = ps.Play(stretched[memo], instr.channel,
+                            name=instr.name)
+        elif isinstance(instr, ps.Delay):
+            instr = ps.Delay(duration, instr.channel, name=instr.name)
+        stop_time = max(stop_time, start_time + instr.duration)
+        pairs.append((start_time, instr))
+    pairs.append((stop_time,
+                  cons.MEAS_SCHED if meas_sched is None else meas_sched))
+    return ps.Schedule(*pairs)
+
+
+@timed("qubit_scaler")
+def qubit_scaler_many(sched: ps.Schedule,
+                      scale_factors: Sequence[float],
+                      cache: Optional[PulseCache] = None
+                      ) -> list[ps.Schedule]:
+    """
+    # Qubit Scaler for many scale factors.
+
+    Walks the instruction tree once, on every channel, solves every
+    distinct pulse for every scale factor in one vectorized call and
+    returns one scaled schedule per scale factor, in the order of
+    scale_factors.
+    Every timed instruction is stretched (pulses keeping their area, with
+    the closed forms for the gaussian family and by resampling for
+    waveforms and other pulses, delays) and both its ends are moved to the
+    scaled time, so channels stay in sync. Each output schedule is built
+    once from a flat list of (time, instruction) pairs.
+    """
+    cache = DEFAULT_CACHE if cache is None else cache
+    plans = plan_schedule(sched, scale_factors)
+    keys = plan_keys(plans)
+    with stage("qubit_scaler/solve"):
+        scaled = dict(zip(keys, cache.get_many(keys)))
+    with stage("qubit_scaler/rebuild"):
+        out_scheds = [build_schedule(plan, scaled) for plan in plans]
+    count("instructions_rewritten", sum(len(plan) for plan in plans))
+    return out_scheds
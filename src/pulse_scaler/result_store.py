@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module result_store.
+
+Content addressed results. An experiment is identified by the fingerprint
+of its (schedule, scale factor, backend calibration, backend name and
+properties, run options): the same experiment built twice, by another
+circuit of a sweep or by another run of a notebook, has the same
+fingerprint. run_cached scales and runs every distinct experiment once and
+stores every result in a ResultStore on disk as soon as its job finishes,
+so that reruns, even of a sweep that failed midway, read the results back
+instead of running them.
+
+    store = ResultStore("results")
+    results = run_cached(scheds, [1, 2, 3], store)
+"""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Optional, Sequence
+import qiskit.pulse as ps
+from qiskit.result import Result
+import pulse_scaler.backends.load_ibmq as cons
+from pulse_scaler.amp_table import calibrated_pulses, fingerprint
+from pulse_scaler.backends.load_ibmq import json_default
+from pulse_scaler.executor import run_all
+from pulse_scaler.instrumentation import count
+from pulse_scaler.pulse_cache import PulseCache
+from pulse_scaler.qubit_scaling import qubit_scaler_many
+
+# Options of run_all that aren't options of backend.run.
+RUN_ALL_OPTIONS = ("max_concurrency", "retries", "poll_interval", "packed",
+                   "max_experiments")
+
+
+def _pulse_content(pulse: Any) -> bytes:
+    """Bytes identifying the envelope of a pulse, its name aside."""
+    if isinstance(pulse, ps.Waveform):
+        samples: bytes = pulse.samples.tobytes()
+        return b"Waveform" + samples
+    return repr((type(pulse).__name__,
+                 sorted(pulse.parameters.items()))).encode()
+
+
+def schedule_fingerprint(sched: ps.Schedule) -> str:
+    """Hash of the timed instructions of sched, pulse names aside."""
+    digest = hashlib.sha256()
+    for time, instr in sched.instructions:
+        digest.update(repr((time, type(instr).__name__)).encode())
+        if isinstance(instr, ps.Play):
+            digest.update(_pulse_content(instr.pulse))
+            digest.update(repr(instr.channel).encode())
+        else:
+            digest.update(repr(instr.operands).encode())
+    return digest.hexdigest()
+
+
+def calibration_fingerprint(calibration: Optional[Any] = None) -> str:
+    """Hash of the calibrated pulses, cons.CALIBRATION if None."""
+    calibration = cons.CALIBRATION if calibration is None else calibration
+    return fingerprint(calibrated_pulses(calibration))
+
+
+def backend_fingerprint(backend: Optional[Any] = None) -> str:
+    """Hash of the name and properties of backend, cons.IBMQBACKEND if None."""
+    backend = cons.IBMQBACKEND if backend is None else backend
+    properties = backend.properties()
+    content = json.dumps(
+        [backend.name(), None if properties is None else properties.to_dict()],
+        sort_keys=True, default=json_default
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def experiment_fingerprint(sched_fp: str,
+                           scale_factor: float,
+                           calibration_fp: str,
+                           backend_fp: str,
+                           run_options: dict[str, Any]) -> str:
+    """Hash of an experiment from the fingerprints of its parts."""
+    content = json.dumps([sched_fp, float(scale_factor), calibration_fp,
+                          backend_fp, run_options],
+                         sort_keys=True, default=json_default)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def single_result(result: Any, experiment: int = 0) -> Result:
+    """Extract the experiment of index experiment of result in a Result."""
+    # ExperimentResult views of packed jobs.
+    experiment += getattr(result, "experiment", 0)
+    result = getattr(result, "result", result)
+    content = result.to_dict()
+    content["results"] = [content["results"][experiment]]
+    return Result.from_dict(content)
+
+
+class ResultStore:
+    """
+    # Results on disk, keyed by fingerprint.
+
+    Every result is a json file of Result.to_dict() in a subdirectory of
+    path named after the first two characters of its fingerprint.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Instantiate ResultStore in the directory path."""
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        """Path of the file of key."""
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def __contains__(self, key: str) -> bool:
+        """Whether the result of key is stored."""
+        return os.path.exists(self._file(key))
+
+    def get(self, key: str) -> Optional[Result]:
+        """Return the stored result of key, None if absent."""
+        try:
+            with open(self._file(key), "r", encoding="utf-8") as file:
+                return Result.from_dict(json.load(file))
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, result: Result) -> None:
+        """Store result under key, atomically."""
+        directory = os.path.dirname(self._file(key))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8",
+                                         dir=directory, suffix=".tmp",
+                                         delete=False) as file:
+            json.dump(result.to_dict(), file, default=json_default)
+        os.replace(file.name, self._file(key))
+
+
+def run_cached(scheds: Sequence[ps.Schedule],
+               scale_factors: Sequence[float],
+               store: ResultStore,
+               backend: Optional[Any] = None,
+               calibration: Optional[Any] = None,
+               cache: Optional[PulseCache] = None,
+               shot_table: Optional[Sequence[Sequence[int]]] = None,
+               **options: Any) -> list[list[Any]]:
+    """
+    # Deduplicated and stored run of scaled schedules.
+
+    Returns the results of every schedule of scheds for every factor of
+    scale_factors, nested as schedules x scale factors. Results found in
+    store are read back, the other distinct experiments are scaled and run
+    once with run_all, each stored as soon as its job finishes.
+
+    params:
+        scheds: schedules without measurement.
+        scale_factors: scale factors, 1 runs the unscaled schedule.
+        store: ResultStore the results are read from and written to.
+        backend: backend to run on, cons.BACKEND if None. Its name and
+            properties are in the fingerprints, those of cons.IBMQBACKEND,
+            the device cons.BACKEND simulates, if None.
+        calibration: instruction schedule map in the fingerprints,
+            cons.CALIBRATION if None.
+        cache: PulseCache of the scaled amplitudes.
+        shot_table: shots of every experiment, nested like the results.
+        options: options of run_all, the options of backend.run are in the
+            fingerprints.
+    """
+    # pylint: disable=too-many-arguments, too-many-locals
+    calibration_fp = calibration_fingerprint(calibration)
+    backend_fp = backend_fingerprint(backend)
+    options.setdefault("meas_return", "avg")
+    options.setdefault("seed_simulator", cons.SEED)
+    shots = options.setdefault("shots", cons.SHOTS)
+    run_options = {name: value for name, value in options.items()
+                   if name not in RUN_ALL_OPTIONS}
+    # Fingerprint of every experiment, and one experiment per fingerprint.
+    keys: list[list[str]] = []
+    todo: dict[str, tuple[int, int]] = {}
+    for circ, sched in enumerate(scheds):
+        sched_fp = schedule_fingerprint(sched)
+        row = []
+        for index, scale_factor in enumerate(scale_factors):
+            n_shots = shots if shot_table is None \
+                else shot_table[circ][index]
+            key = experiment_fingerprint(sched_fp, scale_factor,
+                                         calibration_fp, backend_fp,
+                                         {**run_options, "shots": n_shots})
+            row.append(key)
+            if key not in todo and key not in store:
+                todo[key] = (circ, index)
+        keys.append(row)
+    count("deduplicated",
+          sum(map(len, keys)) - len({key for row in keys for key in row}))
+    # Scale and run the missing experiments only.
+    by_circuit: dict[int, list[tuple[str, int]]] = {}
+    for key, (circ, index) in todo.items():
+        by_circuit.setdefault(circ, []).append((key, index))
+    experiments: list[ps.Schedule] = []
+    run_keys: list[str] = []
+    run_shots: list[int] = []
+    for circ, entries in by_circuit.items():
+        scaled = qubit_scaler_many(
+            scheds[circ], [scale_factors[index] for _, index in entries],
+            cache
+        )
+        experiments.extend(scaled)
+        run_keys.extend(key for key, _ in entries)
+        run_shots.extend(shots if shot_table is None
+                         else shot_table[circ][index]
+                         for _, index in entries)
+    fresh: dict[str, Any] = {}
+
+    def keep(_: int, index: int, result: Any) -> None:
+        """Store a result as soon as its job finishes."""
+        fresh[run_keys[index]] = single_result(result)
+        store.put(run_keys[index], fresh[run_keys[index]])
+
+    if experiments:
+        run_all([experiments], backend, shot_table=[run_shots],
+                on_result=keep, **options)
+    count("store_hits", sum(key not in fresh for row in keys for key in row))
+    return [[fresh[key] if key in fresh else store.get(key) for key in row]
+            for row in keys]
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""
+# Module simulation.
+
+Simulates batches of schedules with the pulse simulator over a process
+pool. Every worker builds its PulseSimulator, and so its PulseSystemModel,
+once and reuses it for all its experiments. Every experiment gets its own
+seed, derived from cons.SEED with numpy.random.SeedSequence, so that the
+results don't depend on the number of workers nor on the scheduling.
+
+    results, report = simulate_scaled(scheds, [1, 2, 3], max_workers=8)
+    print(report.summary())
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+import os
+import sys
+import time
+from typing import Any, NamedTuple, Optional, Sequence
+import numpy as np
+import pulse_scaler.backends.load_ibmq as cons
+from pulse_scaler.instrumentation import stage
+from pulse_scaler.parallel import qubit_scaler_batch
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None  # type: ignore
+
+# State of a worker process, set by _init_worker.
+_SIMULATOR: Any = None
+_RUN_OPTIONS: dict[str, Any] = {}
+
+
+class SimulationReport(NamedTuple):
+    """Wall time and memory usage of a batch of simulations."""
+
+    wall_time: float
+    experiment_times: tuple[float, ...]
+    peak_rss_mb: dict[int, Optional[float]]
+
+    def summary(self) -> str:
+        """Return a human readable summary."""
+        times = np.array(self.experiment_times)
+        peaks = [peak for peak in self.peak_rss_mb.values()
+                 if peak is not None]
+        lines = [
+            f"experiments: {len(times)}",
+            f"workers: {len(self.peak_rss_mb)}",
+            f"wall time: {self.wall_time:.3f} s",
+            f"experiment time: {times.sum():.3f} s total, "
+            f"{times.mean() if len(times) else 0.:.3f} s mean",
+        ]
+        if peaks:
+            lines.append(f"peak memory: {max(peaks):.1f} MB per worker")
+        return "\n".join(lines)
+
+
+def experiment_seeds(n_experiments: int, seed: int = cons.SEED) -> list[int]:
+    """Independent simulator seeds of n_experiments, derived from seed."""
+    return [int(child.generate_state(1)[0])
+            for child in np.random.SeedSequence(seed).spawn(n_experiments)]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of the process in MB, None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere.
+    return float(peak) / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+
+def pulse_simulator(backend: Optional[Any] = None) -> Any:
+    """Pulse simulator of backend, cons.BACKEND if None."""
+    # pylint: disable=import-outside-toplevel
+    if backend is None:
+        return cons.BACKEND
+    from qiskit.providers.aer import PulseSimulator
+    return PulseSimulator.from_backend(backend)
+
+
+def _init_worker(backend: Any, run_options: dict[str, Any]) -> None:
+    """Build the pulse simulator of a worker."""
+    # pylint: disable=global-statement
+    global _SIMULATOR, _RUN_OPTIONS
+    _SIMULATOR = pulse_simulator(backend)
+    _RUN_OPTIONS = run_options
+
+
+def _simulate(simulator: Any,
+              item: tuple[Any, int],
+              run_options: dict[str, Any]
+              ) -> tuple[Any, float, int, Optional[float]]:
+    """Simulate one schedule with its seed."""
+    sched, seed = item
+    start = time.perf_counter()
+    result = simulator.run(sched, seed_simulator=seed,
+                           **run_options).result()
+    return (result, time.perf_counter() - start, os.getpid(),
+            peak_rss_mb())
+
+
+def _simulate_one(item: tuple[Any, int]
+                  ) -> tuple[Any, float, int, Optional[float]]:
+    """Simulate one schedule with its seed inside a worker."""
+    return _simulate(_SIMULATOR, item, _RUN_OPTIONS)
+
+
+def simulate_batch(scheds: Sequence[Any],
+                   backend: Optional[Any] = None,
+                   max_workers: Optional[int] = None,
+                   seed: int = cons.SEED,
+                   **run_options: Any) -> tuple[list[Any], SimulationReport]:
+    """
+    # Pulse simulation over a process pool.
+
+    Returns the result of every schedule of scheds, in order, and a
+    SimulationReport.
+
+    params:
+        scheds: schedules to simulate, measurement included.
+        backend: backend the simulator is built from, picklable, the
+            backend of pulse_scaler.backends.load_ibmq if None.
+        max_workers: number of processes, os.cpu_count() if None, 1
+            simulates in this process.
+        seed: seed the seeds of the experiments are derived from.
+        run_options: options of PulseSimulator.run, meas_return='avg' and
+            shots=cons.SHOTS by default.
+    """
+    run_options.setdefault("meas_return", "avg")
+    run_options.setdefault("shots", cons.SHOTS)
+    items = list(zip(scheds, experiment_seeds(len(scheds), seed)))
+    start = time.perf_counter()
+    with stage("simulation/run"):
+        if max_workers == 1 or len(items) <= 1:
+            simulator = pulse_simulator(backend)
+            outputs = [_simulate(simulator, item, run_options)
+                       for item in items]
+        else:
+            # Aer deadlocks in workers forked from a process that already
+            # simulated, the workers are spawned instead. They don't see
+            # the backend selected with use_backend, it is resolved here.
+            backend = cons.IBMQBACKEND if backend is None else backend
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     mp_context=get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(backend, run_options)) as pool:
+                outputs = list(pool.map(_simulate_one, items))
+    peaks: dict[int, Optional[float]] = {}
+    for _, _, pid, peak in outputs:
+        known = peaks.get(pid)
+        peaks[pid] = peak if known is None or peak is None \
+            else max(known, peak)
+    report = SimulationReport(time.perf_counter() - start,
+                              tuple(output[1] for output in outputs), peaks)
+    return [output[0] for output in outputs], report
+
+
+def simulate_scaled(scheds: Sequence[Any],
+                    scale_factors: Sequence[float],
+                    backend: Optional[Any] = None,
+                    max_workers: Optional[int] = None,
+                    **options: Any
+                    ) -> tuple[list[list[Any]], SimulationReport]:
+    """
+    # Scale factor sweep.
+
+    Scales every schedule of scheds by every factor of scale_factors and
+    simulates all of them with simulate_batch. The results are nested as
+    schedules x scale factors.
+    """
+    scaled = qubit_scaler_batch(scheds, scale_factors,
+                                max_workers=max_workers)
+    flat, report = simulate_batch(
+        [sched for row in scaled for sched in row], backend, max_workers,
+        **options
+    )
+    width = len(scale_factors)
+    return ([flat[row * width:(row + 1) * width]
+             for row in range(len(scheds))], report)
@@ -0,0 +1,5 @@
+# -*- coding-UFT-8 -*-
+"""Run the tests offline on the noiseless fake backend by default."""
+import os
+
+os.environ.setdefault("PULSE_SCALER_BACKEND", "noise_less")
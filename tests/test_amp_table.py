@@ -0,0 +1,60 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the precomputed amplitude table."""
+import os
+import numpy as np
+from pulse_scaler.amp_table import AmpTable, calibrated_pulses
+from pulse_scaler.backends import load_ibmq as cons
+from pulse_scaler.pulse_cache import PulseCache, solve_key
+
+KEYS = [("Gaussian", 160, 1. + 0.j, 40., None),
+        ("Drag", 160, 0.6 + 0.8j, 40., 1.5),
+        ("Gaussian_Square", 800, 0.8 - 0.6j, 64., 544.),
+        ("Gaussian", 16, -1. + 0.j, 4., None)]
+
+
+def test_lookup() -> None:
+    """Test the interpolated amplitudes against the solver."""
+    table = AmpTable.from_keys(KEYS)
+    for key in KEYS:
+        for scale in (1., 1.0123, 2.3456, 3.3321, 4.9876, 5.):
+            amp = table.lookup(key + (scale,))
+            assert amp is not None
+            assert abs(amp - solve_key(key + (scale,))) < 1e-7
+        assert table.lookup(key + (6.,)) is None
+    assert table.lookup(("Gaussian", 16, 0.5, 4., None, 2.)) is None
+
+
+def test_save_and_invalidation(tmp_path: str) -> None:
+    """Test the round trip and the rebuild on a calibration change."""
+    path = os.path.join(tmp_path, "amps.npz")
+    table = AmpTable.from_keys(KEYS)
+    table.save(path)
+    loaded = AmpTable.load(path)
+    assert loaded.keys == table.keys
+    assert loaded.fingerprint == table.fingerprint
+    assert np.array_equal(loaded.ratios, table.ratios)
+    calibration = cons.NoiseLessBackend().defaults().instruction_schedule_map
+    rebuilt = AmpTable.load_or_build(path, calibration)
+    assert rebuilt.keys == calibrated_pulses(calibration)
+    assert rebuilt.fingerprint != table.fingerprint
+    assert AmpTable.load(path).fingerprint == rebuilt.fingerprint
+    np.savez(path, version=1)
+    try:
+        AmpTable.load(path)
+        assert False, "Bad error management."
+    except ValueError:
+        pass
+    with open(path, "wb") as file:
+        file.write(b"not a table")
+    rebuilt = AmpTable.load_or_build(path, calibration)
+    assert AmpTable.load(path).fingerprint == rebuilt.fingerprint
+
+
+def test_cache_uses_table() -> None:
+    """Test that a cache with a table doesn't solve in-grid pulses."""
+    table = AmpTable.from_keys(KEYS)
+    cache = PulseCache(table=table)
+    keys = [key + (3.,) for key in KEYS]
+    pulses = cache.get_many(keys)
+    for key, pulse in zip(keys, pulses):
+        assert abs(complex(pulse.amp) - solve_key(key)) < 1e-7
@@ -0,0 +1,58 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the analytic areas of pulses."""
+import numpy as np
+import pulse_scaler.pulse_areas as areas
+import pulse_scaler.pulse_integrator as integ
+
+
+def test_analytic_matches_quadrature() -> None:
+    """Testing the closed forms against PulseIntegrator."""
+    integrator = integ.PulseIntegrator(0.3+0.1j, 160., 40.)
+    quad = integrator.gaussian_int()[0]
+    assert np.isclose(areas.pulse_areas("Gaussian", 0.3+0.1j, 160., 40.),
+                      quad)
+    integrator.width = 64.
+    quad = integrator.square_gauss_int()[0]
+    assert np.isclose(
+        areas.pulse_areas("Gaussian_Square", 0.3+0.1j, 160., 40., width=64.),
+        quad
+    )
+    integrator.beta = 1.5
+    quad = integrator.drag_int()[0]
+    assert np.isclose(
+        areas.pulse_areas("Drag", 0.3+0.1j, 160., 40.), quad
+    )
+
+
+def test_batch_areas() -> None:
+    """Testing a batch of mixed pulses in one call with the accuracy mode."""
+    shapes = np.array(["Gaussian", "Gaussian_Square", "Drag", "Drag"])
+    amp = np.array([0.2, 0.1+0.05j, 0.5j, 1.])
+    dur = np.array([160., 800., 320., 50.])
+    sig = np.array([40., 64., 80., 12.5])
+    width = np.array([0., 544., 0., 0.])
+    beta = np.array([0., 0., -0.7, 2.])
+    result = areas.pulse_areas(shapes, amp, dur, sig, width=width)
+    assert result.shape == (4,)
+    integ.check_areas(result, shapes, amp, dur, sig, width=width, beta=beta)
+    # A flat top pulse has the area of its duration.
+    assert np.isclose(areas.square_gauss_norm_area(100., 10., 100.), 100.)
+
+
+def test_unsupported_shapes() -> None:
+    """Testing that the right error is raised."""
+    try:
+        areas.normalized_areas("Constant", 10., 2.)
+        assert False, "Bad error management."
+    except ValueError:
+        pass
+    try:
+        areas.normalized_areas("Gaussian_Square", 10., 2.)
+        assert False, "Bad error management."
+    except ValueError:
+        pass
+    try:
+        integ.check_areas(0.1, "Gaussian_Square", 0.1, 10., 2.)
+        assert False, "Bad error management."
+    except ValueError:
+        pass
@@ -0,0 +1,38 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the lazy loading of the backends."""
+import os
+import subprocess
+import sys
+from pulse_scaler.backends import load_ibmq as cons
+
+
+def test_lazy_import() -> None:
+    """Tests that importing the constants imports no qiskit module."""
+    code = ("import sys\n"
+            "import pulse_scaler.backends.load_ibmq\n"
+            "assert not [name for name in sys.modules\n"
+            "            if name.startswith('qiskit')]\n")
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_use_backend() -> None:
+    """Tests that the constants follow the selected backend."""
+    backend = cons.NoiseLessBackend()
+    cons.use_backend(backend)
+    try:
+        assert cons.IBMQBACKEND is backend
+        assert cons.CONFIG.n_qubits == 1
+        assert cons.MEAS_SCHED.duration > 0
+    finally:
+        cons.use_backend(None)
+
+
+def test_snapshot(tmp_path: str) -> None:
+    """Tests that a snapshot is read back as the same backend."""
+    path = os.path.join(tmp_path, "snapshot")
+    backend = cons.NoiseLessBackend()
+    cons.save_snapshot(path, backend)
+    snapshot = cons.SnapshotBackend(path)
+    assert snapshot.configuration().n_qubits == 1
+    assert (snapshot.defaults().instruction_schedule_map.get("x", 0)
+            == backend.defaults().instruction_schedule_map.get("x", 0))
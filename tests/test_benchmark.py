@@ -0,0 +1,23 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the benchmark suite."""
+import pulse_scaler.benchmark as bench
+
+
+def test_compare() -> None:
+    """Test that only slower rates and longer times are flagged."""
+    old = {"results": {"a/obs_per_s": 100., "b/latency_s": 1e-3,
+                       "c/obs_per_s": 10.}}
+    new = {"results": {"a/obs_per_s": 50., "b/latency_s": 1.1e-3,
+                       "c/obs_per_s": 20., "d/obs_per_s": 1.}}
+    regressions = bench.compare(old, new, threshold=0.2)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("a/obs_per_s")
+    new["results"]["b/latency_s"] = 2e-3
+    assert len(bench.compare(old, new, threshold=0.2)) == 2
+
+
+def test_run_suite() -> None:
+    """Test that a suite produces machine readable rates."""
+    result = bench.run(["extrapolation"])
+    assert set(result) == {"meta", "results"}
+    assert all(val > 0 for val in result["results"].values())
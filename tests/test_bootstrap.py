@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""Test the error bars of the zero noise estimates."""
+import numpy as np
+import pulse_scaler.bootstrap as bs
+import pulse_scaler.extrapolation as ex
+import pulse_scaler.marginals as mg
+
+OUTCOMES = np.arange(4, dtype=np.uint64)
+MASKS = mg.pauli_masks(["IZ", "ZI", "ZZ"])
+
+
+def test_outcome_counts() -> None:
+    """Test the counts on the union of the outcomes of many bits."""
+    arrays = [(np.array([2 ** 40, 3], dtype=np.uint64), np.array([2, 1])),
+              (np.array([5, 3, 3], dtype=np.uint64), np.array([1, 1, 2]))]
+    outcomes, counts = bs.outcome_counts(arrays)
+    assert outcomes.tolist() == [3, 5, 2 ** 40]
+    assert counts.tolist() == [[1, 0, 2], [3, 1, 0]]
+
+
+def test_bootstrap_matches_analytic() -> None:
+    """Test the bootstrap against the propagated shot noise."""
+    scale = [1., 2., 3.]
+    probs = np.array([[.7, .1, .1, .1], [.55, .15, .15, .15],
+                      [.4, .2, .2, .2]])
+    counts = np.rint(4000 * probs).astype(int)
+    arrays = [(OUTCOMES, row) for row in counts]
+    expvals = counts @ mg.parity_signs(OUTCOMES, MASKS).T / 4000
+    for method in ("linear", "richardson", "exp"):
+        boot = bs.bootstrap_zne(arrays, scale, MASKS, method,
+                                n_resamples=4000, seed=1)
+        analytic = bs.analytic_zne(arrays, scale, MASKS, method)
+        assert np.allclose(boot.estimate, analytic.estimate)
+        assert np.allclose(boot.estimate,
+                           ex.zne_extr(expvals.T, scale, method))
+        assert np.allclose(boot.stderr, analytic.stderr, rtol=0.1)
+        assert np.all(boot.low < boot.estimate)
+        assert np.all(boot.estimate < boot.high)
+    boot = bs.bootstrap_zne(arrays, scale, MASKS, "epsilon",
+                            n_resamples=200, seed=1)
+    assert boot.estimate.shape == (3,)
+
+
+def test_shared_resamples() -> None:
+    """Test that every observable is evaluated on the same draws."""
+    arrays = [(OUTCOMES, np.array([500, 100, 300, 100])),
+              (OUTCOMES, np.array([400, 200, 200, 200]))]
+    every = bs.bootstrap_zne(arrays, [1., 2.], MASKS, n_resamples=100,
+                             seed=3)
+    first = bs.bootstrap_zne(arrays, [1., 2.], MASKS[:1], n_resamples=100,
+                             seed=3)
+    assert np.allclose(every.stderr[:1], first.stderr)
+    assert np.allclose(every.low[:1], first.low)
+
+
+def test_bad_counts() -> None:
+    """Test error management, should raise a ValueError."""
+    for arrays in ([(OUTCOMES, np.ones(4, dtype=int))] * 2,
+                   [(OUTCOMES, np.ones(4))] * 3,
+                   [(OUTCOMES, np.ones(4, dtype=int)),
+                    (OUTCOMES, np.zeros(4, dtype=int)),
+                    (OUTCOMES, np.ones(4, dtype=int))]):
+        try:
+            bs.bootstrap_zne(arrays, [1., 2., 3.])
+            assert False, "Bad error management."
+        except ValueError:
+            pass
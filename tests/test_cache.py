@@ -0,0 +1,61 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the cache of scaled pulses."""
+import json
+import os
+import qiskit.pulse as ps
+from pulse_scaler.pulse_cache import PulseCache, pulse_key, scale_pulse
+
+
+def test_cache_hits() -> None:
+    """Testing that a reused pulse is only solved once."""
+    cache = PulseCache()
+    pulse = ps.Drag(160, 0.2, 40, 1.5)
+    first = cache.get(pulse, 2)
+    second = cache.get(ps.Drag(160, 0.2, 40, 1.5), 2)
+    assert first is second
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert first == scale_pulse(pulse, 2)
+    assert cache.get(ps.Constant(160, 0.2), 2) is None
+
+
+def test_cache_eviction() -> None:
+    """Testing that the least recently used pulse is evicted."""
+    cache = PulseCache(maxsize=2)
+    pulse = ps.Gaussian(160, 0.2, 40)
+    for scale in (2, 3, 2, 4):
+        cache.get(pulse, scale)
+    assert len(cache) == 2
+    assert cache.stats()["hits"] == 1
+    cache.get(pulse, 3)
+    assert cache.stats()["misses"] == 4
+
+
+def test_cache_persistence(tmp_path: str) -> None:
+    """Testing that a saved cache starts warm."""
+    path = os.path.join(tmp_path, "pulses.json")
+    cache = PulseCache(path=path)
+    pulse = ps.GaussianSquare(800, 0.1, 64, 544)
+    scaled = cache.get(pulse, 3)
+    cache.save()
+    warm = PulseCache(path=path)
+    assert len(warm) == 1
+    assert warm.get(pulse, 3) == scaled
+    assert warm.stats()["hits"] == 1
+    with open(path, "r", encoding="utf-8") as file:
+        content = json.load(file)
+    for field, value in (("fingerprint", "other solver"), ("version", 0)):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({**content, field: value}, file)
+        assert len(PulseCache(path=path)) == 0
+
+
+def test_cache_get_many() -> None:
+    """Testing that a batch of keys is solved like single lookups."""
+    cache = PulseCache()
+    pulse = ps.Drag(160, 0.2, 40, 1.5)
+    keys = [pulse_key(pulse, scale) for scale in (2, 3, 4)]
+    scaled = cache.get_many(keys)
+    assert cache.stats()["misses"] == 3
+    for scale, scaled_pulse in zip((2, 3, 4), scaled):
+        assert scaled_pulse == scale_pulse(pulse, scale)
@@ -0,0 +1,59 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the sampled pulse envelopes."""
+import numpy as np
+import pulse_scaler.envelopes as env
+import pulse_scaler.pulse_areas as areas
+import pulse_scaler.pulse_integrator as integ
+
+
+def test_lifted_convention() -> None:
+    """Testing the lifted gaussian sampled at the middle of the samples."""
+    samples = env.gaussian_samples(160, 0.2, 40)
+    assert samples.shape == (160,)
+    assert np.allclose(samples, samples[::-1])
+    assert np.all(samples.real > 0)
+    assert np.abs(samples).max() <= 0.2
+    square = env.gaussian_square_samples(800, 0.1, 64, 544)
+    assert np.allclose(square[136:664], 0.1)
+    drag = env.drag_samples(160, 0.2, 40, 1.5)
+    assert np.allclose(drag.real, samples.real)
+    assert np.isclose(drag.imag.sum(), 0)
+
+
+def test_sampled_areas() -> None:
+    """Testing the sums of samples against the continuous areas."""
+    shapes = np.array(["Gaussian", "Gaussian_Square", "Drag"])
+    dur = np.array([160, 800, 320])
+    sig = np.array([40., 64., 80.])
+    width = np.array([0., 544., 0.])
+    sampled = env.sampled_norm_areas(shapes, dur, sig, width)
+    continuous = areas.normalized_areas(shapes, dur, sig, width)
+    assert sampled.shape == (3,)
+    assert np.allclose(sampled, continuous, rtol=1e-4)
+
+
+def test_sampled_solve() -> None:
+    """Testing that a scaled pulse keeps the sum of its samples."""
+    samples = env.drag_samples(160, 0.2+0.1j, 40, 1.5)
+    amp = integ.solve_pulse_amps("Drag", 160, 0.2+0.1j, 40, 2.5,
+                                 sampled=True)
+    scaled = env.drag_samples(400, complex(amp), 100, 1.5 * 2.5)
+    assert np.isclose(scaled.sum(), samples.sum())
+    amp = integ.solve_pulse_amps("Drag", 160, 0.2, 40, 3, sampled=True)
+    assert np.isclose(env.sampled_norm_areas("Drag", 480, 120) * amp,
+                      env.sampled_norm_areas("Drag", 160, 40) * 0.2)
+
+
+def test_stretch_samples() -> None:
+    """Testing that stretched samples keep their sum on the dt grid."""
+    samples = env.gaussian_samples(160, 0.2 + 0.1j, 40) \
+        * np.exp(1j * np.linspace(0, 1, 160))
+    assert np.allclose(env.stretch_samples(samples, 160), samples)
+    for dur in (320, 481, 100):
+        stretched = env.stretch_samples(samples, dur)
+        assert stretched.shape == (dur,)
+        assert np.isclose(stretched.sum(), samples.sum(), atol=1e-12)
+    # Zero area envelopes are scaled by the inverse of the stretch.
+    sine = np.sin(np.linspace(0, 2 * np.pi, 100))
+    assert np.isclose(np.abs(env.stretch_samples(sine, 200)).max(), 0.5,
+                      rtol=1e-2)
@@ -0,0 +1,157 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the asyncio executor."""
+import asyncio
+import time
+from typing import Any
+from pulse_scaler.backends.latency import LatencyBackend
+from pulse_scaler.executor import collect_results, expval_vectors, \
+    pack_experiments, run_all
+
+# The fakes only implement what the executor calls.
+# pylint: disable=too-few-public-methods
+
+
+class CountsResult:
+    """Result with fixed counts."""
+
+    def __init__(self, counts: dict[str, int]) -> None:
+        """Instantiate with counts."""
+        self.counts = counts
+
+    def get_counts(self, _: int = 0) -> dict[str, int]:
+        """Return the counts."""
+        return self.counts
+
+
+class PackedResult:
+    """Result of a multi-experiment job."""
+
+    def __init__(self, counts: list[dict[str, int]]) -> None:
+        """Instantiate with the counts of every experiment."""
+        self.counts = counts
+
+    def get_counts(self, experiment: int = 0) -> dict[str, int]:
+        """Return the counts of experiment."""
+        return self.counts[experiment]
+
+
+class EchoBackend:
+    """Backend whose experiments are the counts they return."""
+
+    @staticmethod
+    def run(counts: Any, **options: Any) -> "CountsJob":
+        """Return a job whose result holds counts."""
+        assert set(options) <= {"meas_return", "seed_simulator", "shots"}
+        if isinstance(counts, list):
+            return CountsJob(PackedResult(counts))
+        return CountsJob(CountsResult(counts))
+
+
+class ShotsBackend:
+    """Backend whose results count the shots they ran with."""
+
+    @staticmethod
+    def run(experiments: Any, shots: int = 0, **_: int) -> "CountsJob":
+        """Return a job whose counts hold the shots."""
+        if isinstance(experiments, list):
+            return CountsJob(PackedResult([{"shots": shots}]
+                                          * len(experiments)))
+        return CountsJob(CountsResult({"shots": shots}))
+
+
+class CountsJob:
+    """Job already done."""
+
+    def __init__(self, result: Any) -> None:
+        """Instantiate with its result."""
+        self._result = result
+
+    def result(self) -> Any:
+        """Return the result."""
+        return self._result
+
+
+def test_concurrency_and_vectors() -> None:
+    """Test that jobs overlap, the limit holds and the order is kept."""
+    experiments = [[{"0": 100 - 10 * i, "1": 10 * i} for i in range(3)]
+                   for _ in range(4)]
+    backend = LatencyBackend(EchoBackend(), latency=0.2)
+    start = time.perf_counter()
+    results = run_all(experiments, backend, max_concurrency=4,
+                      poll_interval=0.01)
+    elapsed = time.perf_counter() - start
+    assert backend.max_in_flight == 4
+    assert elapsed < 12 * 0.2
+    expvals = expval_vectors(results)
+    assert expvals.shape == (4, 3)
+    assert abs(expvals[2, 1] - 0.8) < 1e-12
+
+
+def test_retries() -> None:
+    """Test that failed jobs are submitted again."""
+    backend = LatencyBackend(EchoBackend(), latency=0., failures=2)
+    results = run_all([[{"0": 1}]], backend, retries=2)
+    assert backend.submitted == 3
+    assert results[0][0].get_counts() == {"0": 1}
+    backend = LatencyBackend(EchoBackend(), latency=0., failures=2)
+    try:
+        run_all([[{"0": 1}]], backend, retries=1)
+        assert False, "Bad error management."
+    except RuntimeError:
+        pass
+    try:
+        asyncio.run(collect_results([[{"0": 1}]], backend,
+                                    max_concurrency=0))
+        assert False, "Bad error management."
+    except ValueError:
+        pass
+
+
+def test_packed() -> None:
+    """Test that packed jobs are unpacked to (circuit, experiment)."""
+    experiments = [[{"0": 100 - 10 * i - j, "1": 10 * i + j}
+                    for j in range(3)] for i in range(4)]
+    assert [len(pack) for pack in pack_experiments(experiments, 5)] == \
+        [5, 5, 2]
+    backend = LatencyBackend(EchoBackend(), latency=0.)
+    packed = run_all(experiments, backend, packed=True, max_experiments=5)
+    assert backend.submitted == 3
+    unpacked = run_all(experiments, LatencyBackend(EchoBackend(), 0.))
+    assert (expval_vectors(packed) == expval_vectors(unpacked)).all()
+
+
+def test_shots_per_experiment() -> None:
+    """Test that every experiment runs with its own shots."""
+    experiments = [[{"0": 1}, {"0": 2}, {"0": 3}]] * 2
+    shots = [[100, 200, 100]] * 2
+    backend = LatencyBackend(ShotsBackend(), latency=0.)
+    results = run_all(experiments, backend, shot_table=shots)
+    assert [[res.get_counts()["shots"] for res in row]
+            for row in results] == shots
+    packed = run_all(experiments, LatencyBackend(ShotsBackend(), 0.),
+                     packed=True, max_experiments=10, shot_table=shots)
+    assert [[res.get_counts()["shots"] for res in row]
+            for row in packed] == shots
+    try:
+        run_all(experiments, backend, shot_table=[[100]])
+        assert False, "Bad error management."
+    except ValueError:
+        pass
+
+
+def test_on_result() -> None:
+    """Test that every result is reported once, packed or not."""
+    experiments = [[{"0": 10 * i + j} for j in range(3)] for i in range(2)]
+    reported: dict[tuple[int, int], Any] = {}
+
+    def report(circ: int, exp: int, result: Any) -> None:
+        """Record the counts of a result, once."""
+        assert (circ, exp) not in reported
+        reported[circ, exp] = result.get_counts()
+
+    for packed in (False, True):
+        reported.clear()
+        run_all(experiments, LatencyBackend(EchoBackend(), 0.),
+                packed=packed, max_experiments=4, on_result=report)
+        assert reported == {(i, j): experiments[i][j]
+                            for i in range(2) for j in range(3)}
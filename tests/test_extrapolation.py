@@ -33,3 +33,72 @@ def test_linear() -> None:
     val = ex.lin_extr(y_vect, x_vect)
     print(val)
     assert np.isclose(val, -4)
+
+
+def test_epsilon() -> None:
+    """Test the epsilon algorithm on series with known limits."""
+    partial = np.cumsum([(-1) ** k / (k + 1) for k in range(9)])
+    assert np.isclose(ex.epsilon(partial), np.log(2), atol=1e-6)
+    geometric = np.cumsum([0.5 ** k for k in range(5)])
+    assert np.isclose(ex.epsilon(geometric), 2)
+    # A converged series has null differences.
+    assert np.isclose(ex.epsilon([1., 1., 1., 1.]), 1)
+    assert np.isclose(ex.epsilon([0.3]), 0.3)
+
+
+def test_epsilon_batch() -> None:
+    """Test that the batched epsilon matches one call per series."""
+    series = np.array([np.cumsum([r ** k for k in range(6)])
+                       for r in (0.1, 0.5, -0.5, 0.9)])
+    batch = ex.epsilon_batch(series)
+    assert batch.shape == (4,)
+    for row, val in zip(series, batch):
+        assert np.isclose(ex.epsilon(row), val)
+    assert np.allclose(batch, [1 / (1 - r) for r in (0.1, 0.5, -0.5, 0.9)])
+
+
+def test_batched_extrapolation() -> None:
+    """Test the batched engine against the single observable ones."""
+    rng = np.random.default_rng(0)
+    scale = np.array([1., 2., 3., 4.])
+    points = rng.uniform(0.2, 1., size=(20, 4))
+    lin = ex.zne_extr(points, scale, "linear")
+    rich = ex.zne_extr(points, scale, "richardson")
+    poly = ex.zne_extr(points, scale, "poly", order=2)
+    for i, row in enumerate(points):
+        assert np.isclose(lin[i], ex.lin_extr(row, scale))
+        assert np.isclose(rich[i], ex.rich_extr(list(row), list(scale)))
+        assert np.isclose(poly[i], ex.poly_extr(list(row), list(scale)))
+    # Equal variances don't change the fit.
+    weighted = ex.zne_extr(points, scale, "linear",
+                           variances=np.full(points.shape, 0.1))
+    assert np.allclose(weighted, lin)
+
+
+def test_exponential_extrapolation() -> None:
+    """Test the exponential fit on exact exponentials."""
+    scale = np.array([1., 2., 3.])
+    points = np.array([0.8 * np.exp(-0.3 * scale),
+                       -0.5 * np.exp(-0.1 * scale)])
+    assert np.allclose(ex.zne_extr(points, scale, "exp"), [0.8, -0.5])
+    assert np.isclose(ex.exp_extr(list(points[0]), [1, 2, 3]), 0.8)
+    try:
+        ex.zne_extr(np.array([[1., -1., 1.]]), scale, "exp")
+        assert False, "Bad error management."
+    except ValueError:
+        pass
+
+
+def test_shot_allocation() -> None:
+    """Test the variance optimal split of the shots."""
+    scale = [1., 2., 3., 4., 5.]
+    uniform = [10_000] * 5
+    for method in ("linear", "richardson", "poly"):
+        shots = ex.allocate_shots(scale, 50_000, method)
+        assert shots.sum() == 50_000 and shots.min() >= 1
+        assert ex.estimator_variance(scale, shots, method) < \
+            ex.estimator_variance(scale, uniform, method)
+    # Proportional to the weights times the standard deviations.
+    shots = ex.allocate_shots([1., 3.], 4000, "richardson",
+                              stddevs=[1., 2.])
+    assert list(shots) == [2400, 1600]
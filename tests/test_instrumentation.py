@@ -0,0 +1,33 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the instrumentation of the pipeline."""
+import numpy as np
+import pulse_scaler.extrapolation as ex
+import pulse_scaler.pulse_integrator as integ
+from pulse_scaler.instrumentation import profiling, stage
+
+
+def test_profiling_records() -> None:
+    """Testing that the hooks record timings and counters."""
+    with profiling() as prof:
+        integ.find_pulse_amp("Drag", 160., 0.2, 40., 2, beta=1.)
+        integ.find_pulse_amp("Gaussian", 160., 0.2, 40., 2, method="fsolve")
+        ex.zne_extr(np.ones((3, 3)), [1, 2, 3])
+        with stage("backend"):
+            pass
+    summary = prof.summary()
+    assert summary["stages"]["find_pulse_amp"]["calls"] == 2
+    assert summary["stages"]["backend"]["calls"] == 1
+    assert "extrapolation/zne_extr" in summary["stages"]
+    assert summary["counts"]["analytic_solves"] == 1
+    assert summary["counts"]["solver_iterations"] > 0
+    assert summary["counts"]["quadratures"] > 0
+    assert "find_pulse_amp" in prof.report()
+
+
+def test_profiling_disabled() -> None:
+    """Testing that nothing is recorded outside of a profiling block."""
+    with profiling() as prof:
+        pass
+    integ.find_pulse_amp("Drag", 160., 0.2, 40., 2, beta=1.)
+    assert not prof.timings
+    assert not prof.counts
@@ -1,5 +1,6 @@
 # -*- coding-UFT-8 -*-
 """Test related to integration of pulses."""
+import numpy as np
 import pulse_scaler.pulse_integrator as integ
 
 
@@ -56,3 +57,57 @@ def test_kill_unsupported_integrals() -> None:
         integrator.square_gauss_int()
     except ValueError:
         pass
+
+
+def test_analytic_amplitude_solver() -> None:
+    """Testing the closed form solver against the fsolve fallback."""
+    amp = 0.2 + 0.05j
+    for pulse, kwargs in (("Gaussian", {}),
+                          ("Drag", {"beta": 1.2}),
+                          ("Gaussian_Square", {"width": 96.})):
+        analytic = integ.find_pulse_amp(pulse, 160., amp, 40., 3, **kwargs)
+        numeric = integ.find_pulse_amp(pulse, 160., amp, 40., 3,
+                                       method="fsolve", **kwargs)
+        assert analytic is not None and numeric is not None
+        assert np.isclose(analytic, numeric, rtol=1e-6)
+    assert integ.find_pulse_amp("Constant", 160., amp, 40., 3) is None
+
+
+def test_batch_amplitude_solver() -> None:
+    """Testing many (pulse, scale) pairs solved in one call."""
+    scales = np.array([1., 2., 3., 4., 5.])
+    amps = integ.solve_pulse_amps("Drag", 160., 0.2, 40., scales)
+    assert amps.shape == (5,)
+    assert np.isclose(amps[0], 0.2)
+    assert np.all(np.abs(np.diff(amps)) > 0)
+    amps = integ.solve_pulse_amps(np.array([["Drag"], ["Gaussian_Square"]]),
+                                  np.array([[160.], [800.]]),
+                                  np.array([[0.2], [0.1j]]),
+                                  np.array([[40.], [64.]]),
+                                  scales,
+                                  width=np.array([[0.], [544.]]))
+    assert amps.shape == (2, 5)
+
+
+def test_lazy_area() -> None:
+    """Testing that areas are computed on access and follow the setters."""
+    integrator = integ.PulseIntegrator(1+1j, 160, 40, beta=1.5)
+    assert not integrator._areas  # pylint: disable=protected-access
+    area = integrator.area
+    assert integrator.area is area
+    integrator.dur = 320
+    integrator.sig = 80
+    assert np.isclose(integrator.area[0], 2 * area[0], rtol=1e-2)
+    assert integrator.area[0] != area[0]
+    integrator.beta = None
+    assert integrator.shape == "Gaussian"
+
+
+def test_fsolve_keeps_area() -> None:
+    """Testing that the numerical solve keeps the original area."""
+    amp = integ.find_pulse_amp("Gaussian", 160, 0.2 + 0.1j, 40, 2,
+                               method="fsolve")
+    assert amp is not None
+    scaled = integ.PulseIntegrator(amp, 320, 80)
+    assert np.isclose(scaled.area[0],
+                      integ.PulseIntegrator(0.2 + 0.1j, 160, 40).area[0])
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding-UFT-8 -*-
+"""Test the expectation values of counts and memory."""
+import numpy as np
+import pulse_scaler.marginals as mg
+
+
+class MemoryResult:
+    """Result with counts and memory, like qiskit.result.Result."""
+
+    def __init__(self, memory: list[str]) -> None:
+        """Instantiate with the memory of one experiment."""
+        self.memory = memory
+
+    def get_memory(self, experiment: int = 0) -> list[str]:
+        """Return the memory."""
+        assert experiment == 0
+        return self.memory
+
+    def get_counts(self, experiment: int = 0) -> dict[str, int]:
+        """Return the counts of the memory."""
+        keys, counts = np.unique(self.get_memory(experiment),
+                                 return_counts=True)
+        return dict(zip(keys.tolist(), counts.tolist()))
+
+
+def test_parse_and_popcount() -> None:
+    """Test the conversion of bitstrings and the number of set bits."""
+    keys = ["01 00", "10 11", "00 01"]
+    assert mg.parse_bitstrings(keys).tolist() == [4, 11, 1]
+    assert mg.parse_bitstrings(["0x5", "0xff"]).tolist() == [5, 255]
+    assert mg.parse_bitstrings(["1", "101"]).tolist() == [1, 5]
+    values = np.array([0, 1, 7, 2 ** 63 + 3, 2 ** 64 - 1], dtype=np.uint64)
+    assert mg.popcount(values).tolist() == [0, 1, 3, 3, 64]
+    assert mg.pauli_masks(["IIZ", "ZIZ", "XYI"]).tolist() == [1, 5, 6]
+    assert mg.parse_bitstrings(["1" * 64]).tolist() == [2 ** 64 - 1]
+    for keys in (["0x1" + "0" * 16], ["1", "1" * 65]):
+        try:
+            mg.parse_bitstrings(keys)
+            assert False, "Bad error management."
+        except ValueError:
+            pass
+
+
+def test_expval_matrix() -> None:
+    """Test Z and ZZ against the expectation values of the bitstrings."""
+    rng = np.random.default_rng(0)
+    results = [MemoryResult(rng.choice(["00", "01", "10", "11"], 1000,
+                                       p=probs).tolist())
+               for probs in ([.4, .1, .1, .4], [.3, .2, .2, .3])]
+    paulis = ["IZ", "ZI", "ZZ", "II"]
+    expvals = mg.expval_matrix(results, mg.pauli_masks(paulis))
+    assert expvals.shape == (4, 2)
+    for column, result in enumerate(results):
+        bits = np.array([[int(key[1]), int(key[0])]
+                         for key in result.memory])
+        expected = [np.mean(1 - 2 * bits[:, 0]),
+                    np.mean(1 - 2 * bits[:, 1]),
+                    np.mean(1 - 2 * (bits.sum(axis=1) % 2)), 1.]
+        assert np.allclose(expvals[:, column], expected)
+    assert np.allclose(mg.expval_matrix(results, mg.pauli_masks(paulis),
+                                        memory=True), expvals)
@@ -0,0 +1,23 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the scaling of batches of schedules."""
+import qiskit as qs
+from pulse_scaler.backends import load_ibmq as cons
+from pulse_scaler.parallel import qubit_scaler_batch
+from pulse_scaler.qubit_scaling import qubit_scaler_many
+
+
+def test_batch_matches_serial() -> None:
+    """Tests that the process pool keeps the order and the pulses."""
+    scheds = []
+    for n_x in range(1, 5):
+        q_c = qs.QuantumCircuit(1, 1)
+        for _ in range(n_x):
+            q_c.x(0)
+        trans_qc = qs.compiler.transpile(q_c,
+                                         cons.BACKEND,
+                                         optimization_level=0)
+        scheds.append(qs.schedule(trans_qc, cons.BACKEND))
+    batch = qubit_scaler_batch(scheds, [2, 3], max_workers=2)
+    assert len(batch) == len(scheds)
+    for sched, scaled in zip(scheds, batch):
+        assert scaled == qubit_scaler_many(sched, [2, 3])
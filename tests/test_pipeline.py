@@ -0,0 +1,95 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the streaming pipeline."""
+import math
+import qiskit as qs
+from pulse_scaler.pipeline import ZnePoint, extrapolate_stage, run_stage, \
+    stream_zne
+
+# The fakes only implement what the pipeline calls.
+# pylint: disable=too-few-public-methods
+
+
+class FakeResult:
+    """Result with fixed counts."""
+
+    def __init__(self, counts: dict[str, int]) -> None:
+        """Instantiate with counts."""
+        self.counts = counts
+
+    def get_counts(self, _: int = 0) -> dict[str, int]:
+        """Return the counts."""
+        return self.counts
+
+
+class FakeJob:
+    """Job finishing after a number of polls."""
+
+    def __init__(self, result: FakeResult, polls: int) -> None:
+        """Instantiate a job finishing after polls polls."""
+        self._result = result
+        self.polls = polls
+
+    def in_final_state(self) -> bool:
+        """Whether the job finished."""
+        self.polls -= 1
+        return self.polls < 0
+
+    def result(self) -> FakeResult:
+        """Return the result."""
+        return self._result
+
+
+class FakeBackend:
+    """Backend returning slower jobs for larger counts."""
+
+    @staticmethod
+    def run(counts: dict[str, int], **_: int) -> FakeJob:
+        """Run an experiment that returns counts."""
+        return FakeJob(FakeResult(counts), polls=counts["0"] // 10)
+
+
+def test_window_and_partial_estimates() -> None:
+    """Test the in-flight window and the order of the estimates."""
+    items = [(0, 0, {"0": 90, "1": 10}), (0, 1, {"0": 80, "1": 20}),
+             (1, 0, {"0": 50, "1": 50}), (1, 1, {"0": 40, "1": 60})]
+    results = list(run_stage(iter(items), FakeBackend(), window=2,
+                             poll_interval=0))
+    assert sorted(index[:2] for index in results) == [(0, 0), (0, 1),
+                                                      (1, 0), (1, 1)]
+    points = list(extrapolate_stage(iter(results), [1, 2]))
+    assert len(points) == 2
+    assert all(isinstance(point, ZnePoint) and point.complete
+               for point in points)
+    estimates = {point.circuit: point.estimate for point in points}
+    # <Z> at scale factors 1 and 2, the line through them at 0.
+    parities: dict[int, list[float]] = {0: [], 1: []}
+    for circuit, _, counts in items:
+        parities[circuit].append((counts["0"] - counts["1"]) / 100)
+    for circuit, (first, second) in parities.items():
+        assert abs(estimates[circuit] - (2 * first - second)) < 1e-9
+
+
+def test_failed_fit() -> None:
+    """Test that a failed fit doesn't end the stream."""
+    items = [(0, 0, FakeResult({"0": 90, "1": 10})),
+             (0, 1, FakeResult({"0": 20, "1": 80})),
+             (1, 0, FakeResult({"0": 90, "1": 10})),
+             (1, 1, FakeResult({"0": 80, "1": 20}))]
+    points = list(extrapolate_stage(iter(items), [1, 2], "exp"))
+    assert [point.circuit for point in points] == [0, 1]
+    assert math.isnan(points[0].estimate)
+    assert abs(points[1].estimate - .8 ** 2 / .6) < 1e-9
+
+
+def test_stream_end_to_end() -> None:
+    """Test the pipeline against the local pulse simulator."""
+    circuits = []
+    for _ in range(2):
+        q_c = qs.QuantumCircuit(1, 1)
+        q_c.x(0)
+        circuits.append(q_c)
+    points = list(stream_zne(iter(circuits), [1, 2, 3], window=2,
+                             transpile_options={"optimization_level": 0}))
+    complete = [point for point in points if point.complete]
+    assert sorted(point.circuit for point in complete) == [0, 1]
+    assert all(len(point.values) == 3 for point in complete)
@@ -0,0 +1,47 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the columnar pulse table."""
+import numpy as np
+import qiskit.pulse as ps
+from pulse_scaler.pulse_cache import pulse_key, solve_key
+from pulse_scaler.pulse_integrator import PulseIntegrator
+from pulse_scaler.pulse_table import PULSE_DTYPE, PulseTable
+
+
+def _schedule() -> ps.Schedule:
+    """Schedule playing one pulse of every supported shape and a waveform."""
+    return ps.Schedule(
+        (0, ps.Play(ps.Gaussian(160, 0.2 + 0.05j, 40),
+                    ps.DriveChannel(0))),
+        (0, ps.Play(ps.Drag(160, 0.1, 40, 1.5), ps.DriveChannel(1))),
+        (160, ps.Play(ps.GaussianSquare(800, 0.1j, 64, 544),
+                      ps.ControlChannel(0))),
+        (160, ps.Play(ps.Waveform([0.1, 0.2]), ps.DriveChannel(0))),
+    )
+
+
+def test_from_schedule() -> None:
+    """Test the columns filled from a schedule."""
+    table = PulseTable.from_schedule(_schedule())
+    assert len(table) == 3
+    assert table.data.dtype == PULSE_DTYPE
+    assert list(table.shapes) == ["Gaussian", "Drag", "Gaussian_Square"]
+    assert list(table.data["time"]) == [0, 0, 160]
+    view = table[2]
+    assert view.width == 544 and view.beta is None
+    assert view.key(2.) == pulse_key(ps.GaussianSquare(800, 0.1j, 64, 544),
+                                     2.)
+
+
+def test_areas_and_solve() -> None:
+    """Test the vectorized areas and amplitudes against the per pulse ones."""
+    table = PulseTable.from_schedule(_schedule())
+    integrators = [PulseIntegrator(0.2 + 0.05j, 160, 40),
+                   PulseIntegrator(0.1, 160, 40, beta=1.5),
+                   PulseIntegrator(0.1j, 800, 64, width=544)]
+    areas = table.areas()
+    for area, integ in zip(areas, integrators):
+        assert np.isclose(area, integ.area[0], rtol=1e-6)
+    amps = table.solve(3.)
+    for amp, key in zip(amps, table.keys(3.)):
+        assert np.isclose(amp, solve_key(key))
+    assert np.isclose(table[1].area, areas[1])
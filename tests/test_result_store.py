@@ -0,0 +1,59 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the content addressed result store."""
+import os
+import qiskit as qs
+from qiskit.result import Result
+from pulse_scaler.backends import load_ibmq as cons
+from pulse_scaler.instrumentation import profiling
+from pulse_scaler.result_store import ResultStore, backend_fingerprint, \
+    run_cached, schedule_fingerprint
+
+
+def _schedule(n_gates: int) -> qs.pulse.Schedule:
+    """Schedule of n_gates X gates on the noiseless backend."""
+    q_c = qs.QuantumCircuit(1, 1)
+    for _ in range(n_gates):
+        q_c.x(0)
+    trans_qc = qs.compiler.transpile(q_c, cons.BACKEND, optimization_level=0)
+    return qs.schedule(trans_qc, cons.BACKEND)
+
+
+def test_fingerprint() -> None:
+    """Test that equal schedules share a fingerprint."""
+    assert schedule_fingerprint(_schedule(1)) == \
+        schedule_fingerprint(_schedule(1))
+    assert schedule_fingerprint(_schedule(1)) != \
+        schedule_fingerprint(_schedule(2))
+    # Both fake backends share their calibrations, not their properties.
+    assert backend_fingerprint(cons.NoiseLessBackend()) != \
+        backend_fingerprint(cons.NoiseBackend(1))
+
+
+def test_run_cached(tmp_path: str) -> None:
+    """Test the deduplication and the reuse of stored results."""
+    store = ResultStore(os.path.join(tmp_path, "results"))
+    scheds = [_schedule(1), _schedule(1), _schedule(2)]
+    with profiling() as prof:
+        first = run_cached(scheds, [1, 2], store, shots=128)
+    assert prof.counts["deduplicated"] == 2
+    assert prof.counts["store_hits"] == 0
+    with profiling() as prof:
+        second = run_cached(scheds, [1, 2], store, shots=128)
+    assert prof.counts["store_hits"] == 6
+    assert [[res.get_counts() for res in row] for row in first] == \
+        [[res.get_counts() for res in row] for row in second]
+    # Fresh and stored results are both single experiment results.
+    assert all(isinstance(res, Result) for row in first + second
+               for res in row)
+    packed = run_cached(scheds, [1, 2], ResultStore(os.path.join(
+        tmp_path, "packed")), shots=128, packed=True, max_experiments=4)
+    assert all(isinstance(res, Result) for row in packed for res in row)
+    assert [[res.get_counts() for res in row] for row in packed] == \
+        [[res.get_counts() for res in row] for row in first]
+    with profiling() as prof:
+        run_cached(scheds[:1], [1, 2], store, shots=256)
+    assert prof.counts["store_hits"] == 0
+    with profiling() as prof:
+        run_cached(scheds[:1], [1, 2], store, shots=128,
+                   meas_return="single")
+    assert prof.counts["store_hits"] == 0
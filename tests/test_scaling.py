@@ -2,9 +2,10 @@
 # -*- coding-UFT-8 -*-
 """Test related to the scaling of a circuit."""
 import math
+import numpy as np
 import qiskit as qs
 from pulse_scaler.backends import load_ibmq as cons
-from pulse_scaler.qubit_scaling import qubit_scaler
+from pulse_scaler.qubit_scaling import qubit_scaler, qubit_scaler_many
 
 
 def test_single_h() -> None:
@@ -83,3 +84,85 @@ def test_regular_noiseless_circuit() -> None:
     exp_val_sched = sim_result.get_counts()["1"] / cons.SHOTS
     print(exp_val_norm, exp_val_sched)
     assert math.isclose(exp_val_norm, exp_val_sched, rel_tol=0.1)
+
+
+def test_scaler_many() -> None:
+    """Tests that the batch scaler matches one scaler call per factor."""
+    qreg = qs.QuantumRegister(1)
+    creg = qs.ClassicalRegister(1)
+    q_c = qs.QuantumCircuit(qreg, creg)
+    q_c.x(qreg)
+    q_c.sx(qreg)
+    trans_qc = qs.compiler.transpile(q_c,
+                                     cons.BACKEND,
+                                     optimization_level=0)
+    qc_sched = qs.schedule(trans_qc, cons.BACKEND)
+    scaled_qcs = qubit_scaler_many(qc_sched, [2, 3, 4])
+    assert len(scaled_qcs) == 3
+    for scale, scaled_qc in zip([2, 3, 4], scaled_qcs):
+        assert scaled_qc == qubit_scaler(qc_sched, scale)
+
+
+def test_scaled_start_times() -> None:
+    """Tests that every instruction starts at its scaled start time."""
+    q_c = qs.QuantumCircuit(1, 1)
+    q_c.x(0)
+    q_c.sx(0)
+    q_c.x(0)
+    trans_qc = qs.compiler.transpile(q_c,
+                                     cons.BACKEND,
+                                     optimization_level=0)
+    qc_sched = qs.schedule(trans_qc, cons.BACKEND)
+    scaled_qc = qubit_scaler(qc_sched, 3)
+    times = [time for time, _ in qc_sched.instructions]
+    scaled_times = [time for time, _ in scaled_qc.instructions]
+    assert scaled_times[:len(times)] == [3 * time for time in times]
+    assert scaled_qc.stop_time >= 3 * qc_sched.stop_time
+
+
+def test_channel_aware_scaling() -> None:
+    """Tests that every channel is stretched and stays in sync."""
+    drive, control = qs.pulse.DriveChannel(0), qs.pulse.ControlChannel(0)
+    sched = qs.pulse.Schedule(
+        (0, qs.pulse.Play(qs.pulse.Drag(160, 0.2, 40, 1.), drive, name="x")),
+        (0, qs.pulse.Delay(160, control, name="wait")),
+        (160, qs.pulse.ShiftPhase(1.57, control)),
+        (160, qs.pulse.Play(qs.pulse.GaussianSquare(800, 0.1, 64, 544),
+                            control, name="cr")),
+        (160, qs.pulse.Delay(800, drive)),
+        (960, qs.pulse.Play(qs.pulse.Drag(160, 0.2, 40, 1.), drive)),
+    )
+    for scale in (2, 1.5, 2.7):
+        scaled = qubit_scaler(sched, scale)
+        for chan in (drive, control):
+            times = [(time, instr.duration) for time, instr
+                     in scaled.filter(channels=[chan]).instructions]
+            # Contiguous instructions stay contiguous.
+            for (time, dur), (next_time, _) in zip(times, times[1:]):
+                assert time + dur == next_time
+        # Each channel ends at its own scaled end time.
+        assert scaled.filter(channels=[drive]).stop_time \
+            == round(1120 * scale)
+        assert scaled.filter(channels=[control]).stop_time \
+            == round(960 * scale)
+        # The rebuilt instructions keep their names.
+        names = [str(instr.name) for _, instr
+                 in scaled.filter(channels=[drive, control]).instructions]
+        assert sorted(names) == sorted(str(instr.name) for _, instr
+                                       in sched.instructions)
+
+
+def test_waveform_scaling() -> None:
+    """Tests that waveforms and constants are stretched keeping areas."""
+    drive = qs.pulse.DriveChannel(0)
+    samples = 0.1 * np.hanning(64) * np.exp(0.3j)
+    sched = qs.pulse.Schedule(
+        (0, qs.pulse.Play(qs.pulse.Waveform(samples), drive)),
+        (64, qs.pulse.Play(qs.pulse.Constant(32, 0.2), drive)),
+    )
+    scaled = qubit_scaler(sched, 2.5).filter(channels=[drive])
+    (_, wave), (time, const) = scaled.instructions
+    assert wave.duration == 160 and time == 160
+    assert np.isclose(wave.pulse.samples.sum(), samples.sum())
+    assert const.duration == 80
+    assert np.isclose(const.pulse.amp * 80, 0.2 * 32)
@@ -0,0 +1,62 @@
+# -*- coding-UFT-8 -*-
+"""Test related to the parallel pulse simulation."""
+from typing import Any
+import qiskit as qs
+from pulse_scaler.backends import load_ibmq as cons
+from pulse_scaler.simulation import experiment_seeds, simulate_batch, \
+    simulate_scaled
+
+
+def _x_schedule() -> qs.pulse.Schedule:
+    """Schedule of an X gate on the noiseless backend."""
+    q_c = qs.QuantumCircuit(1, 1)
+    q_c.x(0)
+    trans_qc = qs.compiler.transpile(q_c, cons.BACKEND, optimization_level=0)
+    return qs.schedule(trans_qc, cons.BACKEND)
+
+
+def test_seeds() -> None:
+    """Test that the seeds are deterministic and distinct."""
+    seeds = experiment_seeds(10)
+    assert seeds == experiment_seeds(10)
+    assert len(set(seeds)) == 10
+    assert experiment_seeds(3) == seeds[:3]
+
+
+def test_parallel_matches_serial() -> None:
+    """Test that the results don't depend on the number of workers."""
+    sched = _x_schedule()
+    sched += cons.MEAS_SCHED << sched.duration
+    serial, _ = simulate_batch([sched] * 3, cons.NoiseLessBackend(),
+                               max_workers=1, shots=256)
+    parallel, report = simulate_batch([sched] * 3, cons.NoiseLessBackend(),
+                                      max_workers=2, shots=256)
+    assert [res.get_counts() for res in serial] == \
+        [res.get_counts() for res in parallel]
+    assert len(report.experiment_times) == 3
+    assert report.wall_time > 0
+
+
+def test_scaled_sweep() -> None:
+    """Test the nesting of a scale factor sweep."""
+    results, report = simulate_scaled([_x_schedule()] * 2, [1, 2],
+                                      cons.NoiseLessBackend(),
+                                      max_workers=1, shots=128)
+    assert [len(row) for row in results] == [2, 2]
+    assert "experiments: 4" in report.summary()
+
+
+def test_workers_follow_use_backend(monkeypatch: Any) -> None:
+    """Test that the workers use the backend selected in this process."""
+    monkeypatch.delenv(cons.BACKEND_ENV, raising=False)
+    monkeypatch.delenv(cons.SNAPSHOT_ENV, raising=False)
+    cons.use_backend(cons.NoiseLessBackend())
+    try:
+        serial, _ = simulate_scaled([_x_schedule()] * 2, [1, 2],
+                                    max_workers=1, shots=128)
+        parallel, _ = simulate_scaled([_x_schedule()] * 2, [1, 2],
+                                      max_workers=2, shots=128)
+        assert [[res.get_counts() for res in row] for row in serial] == \
+            [[res.get_counts() for res in row] for row in parallel]
+    finally:
+        cons.use_backend(None)